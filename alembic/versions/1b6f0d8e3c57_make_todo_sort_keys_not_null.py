@@ -0,0 +1,51 @@
+"""Make todo sort keys not null
+
+Revision ID: 1b6f0d8e3c57
+Revises: 7e3b5d9c1a24
+Create Date: 2026-10-18 19:02:31.540218
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6f0d8e3c57'
+down_revision: Union[str, None] = '7e3b5d9c1a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _sqlite_triggers() -> list[str]:
+    # SQLite applies the change by copying todos into a new table, which drops
+    # the search and counts triggers along with the old one.
+    if op.get_bind().dialect.name != "sqlite":
+        return []
+    return op.get_bind().exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'todos'"
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset cursors compare (priority, id) and (title, id) tuples, which
+    # cannot order NULLs; backfill them the way todo_counts already counts them.
+    op.execute("UPDATE todos SET priority = 0 WHERE priority IS NULL")
+    op.execute("UPDATE todos SET title = '' WHERE title IS NULL")
+    triggers = _sqlite_triggers()
+    with op.batch_alter_table("todos") as batch_op:
+        batch_op.alter_column("priority", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column("title", existing_type=sa.String(), nullable=False)
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    triggers = _sqlite_triggers()
+    with op.batch_alter_table("todos") as batch_op:
+        batch_op.alter_column("title", existing_type=sa.String(), nullable=True)
+        batch_op.alter_column("priority", existing_type=sa.Integer(), nullable=True)
+    for trigger in triggers:
+        op.execute(trigger)
@@ -0,0 +1,27 @@
+"""Add owner priority index to todos
+
+Revision ID: 3f9c2a7d5e41
+Revises: 81de6bca3b7e
+Create Date: 2026-10-18 09:12:44.518203
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d5e41'
+down_revision: Union[str, None] = '81de6bca3b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_todos_owner_id_priority_id", "todos", ["owner_id", "priority", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_owner_id_priority_id", table_name="todos")
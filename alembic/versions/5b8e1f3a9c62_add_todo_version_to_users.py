@@ -0,0 +1,27 @@
+"""Add todo version to users
+
+Revision ID: 5b8e1f3a9c62
+Revises: c7d2e9f14b08
+Create Date: 2026-10-18 15:20:31.670945
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f3a9c62'
+down_revision: Union[str, None] = 'c7d2e9f14b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("todo_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "todo_version")
@@ -0,0 +1,51 @@
+"""Autoincrement todo ids
+
+Revision ID: 6a2d9e4b7f18
+Revises: 1b6f0d8e3c57
+Create Date: 2026-10-18 19:20:47.318604
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2d9e4b7f18'
+down_revision: Union[str, None] = '1b6f0d8e3c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_todos(autoincrement: bool) -> None:
+    # Postgres sequences never hand out an id twice; only SQLite needs the
+    # AUTOINCREMENT keyword, which means copying todos into a new table. The
+    # copy drops the search and counts triggers, so they are recreated after.
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    triggers = bind.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'todos'"
+    ).scalars().all()
+    with op.batch_alter_table("todos", recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+        pass
+    for trigger in triggers:
+        op.execute(trigger)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild_todos(autoincrement=True)
+    if op.get_bind().dialect.name == "sqlite":
+        # Ids deleted above the current maximum were already handed out once;
+        # the tombstones remember them.
+        op.execute("DELETE FROM sqlite_sequence WHERE name = 'todos'")
+        op.execute(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT 'todos', max("
+            "(SELECT coalesce(max(id), 0) FROM todos), (SELECT coalesce(max(todo_id), 0) FROM todo_tombstones))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild_todos(autoincrement=False)
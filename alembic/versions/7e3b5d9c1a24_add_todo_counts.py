@@ -0,0 +1,60 @@
+"""Add todo counts
+
+Revision ID: 7e3b5d9c1a24
+Revises: 4c8a1e7f2b93
+Create Date: 2026-10-18 17:58:40.117395
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3b5d9c1a24'
+down_revision: Union[str, None] = '4c8a1e7f2b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTS_DDL = {
+    "sqlite": [
+        "CREATE TRIGGER IF NOT EXISTS todo_counts_insert AFTER INSERT ON todos WHEN new.owner_id IS NOT NULL BEGIN INSERT INTO todo_counts (owner_id, complete, priority, count) VALUES (new.owner_id, coalesce(new.complete, 0), coalesce(new.priority, 0), 1) ON CONFLICT (owner_id, complete, priority) DO UPDATE SET count = count + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS todo_counts_delete AFTER DELETE ON todos WHEN old.owner_id IS NOT NULL BEGIN UPDATE todo_counts SET count = count - 1 WHERE owner_id = old.owner_id AND complete = coalesce(old.complete, 0) AND priority = coalesce(old.priority, 0); END",
+        "CREATE TRIGGER IF NOT EXISTS todo_counts_update AFTER UPDATE OF owner_id, complete, priority ON todos BEGIN UPDATE todo_counts SET count = count - 1 WHERE owner_id = old.owner_id AND complete = coalesce(old.complete, 0) AND priority = coalesce(old.priority, 0); INSERT INTO todo_counts (owner_id, complete, priority, count) SELECT new.owner_id, coalesce(new.complete, 0), coalesce(new.priority, 0), 1 WHERE new.owner_id IS NOT NULL ON CONFLICT (owner_id, complete, priority) DO UPDATE SET count = count + 1; END",
+    ],
+    "postgresql": [
+        "CREATE OR REPLACE FUNCTION todo_counts_apply() RETURNS trigger AS $$ BEGIN IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.owner_id IS NOT NULL THEN UPDATE todo_counts SET count = count - 1 WHERE owner_id = OLD.owner_id AND complete = coalesce(OLD.complete, false) AND priority = coalesce(OLD.priority, 0); END IF; IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.owner_id IS NOT NULL THEN INSERT INTO todo_counts (owner_id, complete, priority, count) VALUES (NEW.owner_id, coalesce(NEW.complete, false), coalesce(NEW.priority, 0), 1) ON CONFLICT (owner_id, complete, priority) DO UPDATE SET count = todo_counts.count + 1; END IF; RETURN NULL; END $$ LANGUAGE plpgsql",
+        "DROP TRIGGER IF EXISTS todo_counts_apply ON todos",
+        "CREATE TRIGGER todo_counts_apply AFTER INSERT OR DELETE OR UPDATE OF owner_id, complete, priority ON todos FOR EACH ROW EXECUTE FUNCTION todo_counts_apply()",
+    ],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "todo_counts",
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("complete", sa.Boolean(), primary_key=True),
+        sa.Column("priority", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO todo_counts (owner_id, complete, priority, count) "
+        "SELECT owner_id, coalesce(complete, false), coalesce(priority, 0), count(*) FROM todos "
+        "WHERE owner_id IS NOT NULL GROUP BY owner_id, coalesce(complete, false), coalesce(priority, 0)"
+    )
+    for statement in COUNTS_DDL.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("todo_counts_insert", "todo_counts_delete", "todo_counts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    elif dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS todo_counts_apply ON todos")
+        op.execute("DROP FUNCTION IF EXISTS todo_counts_apply()")
+    op.drop_table("todo_counts")
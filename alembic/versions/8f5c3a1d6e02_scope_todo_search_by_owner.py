@@ -0,0 +1,69 @@
+"""Scope todo search by owner
+
+Revision ID: 8f5c3a1d6e02
+Revises: 6a2d9e4b7f18
+Create Date: 2026-10-18 19:41:05.962713
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f5c3a1d6e02'
+down_revision: Union[str, None] = '6a2d9e4b7f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(title, description, owner_id, content='todos', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN INSERT INTO todos_fts(rowid, title, description, owner_id) VALUES (new.id, new.title, new.description, new.owner_id); END",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) VALUES ('delete', old.id, old.title, old.description, old.owner_id); END",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description, owner_id ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) VALUES ('delete', old.id, old.title, old.description, old.owner_id); INSERT INTO todos_fts(rowid, title, description, owner_id) VALUES (new.id, new.title, new.description, new.owner_id); END",
+    ],
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        f"CREATE INDEX IF NOT EXISTS ix_todos_owner_id_search ON todos USING gin (owner_id, ({SEARCH_VECTOR}))",
+    ],
+}
+
+PREVIOUS_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(title, description, content='todos', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    ],
+    "postgresql": [
+        f"CREATE INDEX IF NOT EXISTS ix_todos_search ON todos USING gin ({SEARCH_VECTOR})",
+    ],
+}
+
+
+def _replace_search_index(ddl: dict, old_index: str) -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # FTS5 columns are fixed at creation, so the table is rebuilt from todos.
+        for trigger in ("todos_fts_insert", "todos_fts_delete", "todos_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS todos_fts")
+    for statement in ddl.get(dialect, []):
+        op.execute(statement)
+    if dialect == "sqlite":
+        op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.drop_index(old_index, table_name="todos")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_search_index(SEARCH_DDL, "ix_todos_search")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_search_index(PREVIOUS_SEARCH_DDL, "ix_todos_owner_id_search")
@@ -0,0 +1,27 @@
+"""Add owner title index to todos
+
+Revision ID: 9d4f7b2e6a10
+Revises: e2a6c4d81f95
+Create Date: 2026-10-18 16:02:37.518204
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f7b2e6a10'
+down_revision: Union[str, None] = 'e2a6c4d81f95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_todos_owner_id_title_id", "todos", ["owner_id", "title", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_owner_id_title_id", table_name="todos")
@@ -0,0 +1,29 @@
+"""Add owner complete index to todos
+
+Revision ID: a41e8b6c0d23
+Revises: 3f9c2a7d5e41
+Create Date: 2026-10-18 10:03:17.904562
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41e8b6c0d23'
+down_revision: Union[str, None] = '3f9c2a7d5e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_todos_owner_id_complete_priority_id", "todos", ["owner_id", "complete", "priority", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_owner_id_complete_priority_id", table_name="todos")
@@ -0,0 +1,30 @@
+"""Add owner title C index to todos
+
+Revision ID: b3e7c1f4a9d5
+Revises: 8f5c3a1d6e02
+Create Date: 2026-10-18 20:14:52.607133
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7c1f4a9d5'
+down_revision: Union[str, None] = '8f5c3a1d6e02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite compares titles bytewise already; only Postgres needs a "C" index.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute('CREATE INDEX IF NOT EXISTS ix_todos_owner_id_title_c ON todos (owner_id, (title COLLATE "C"), id)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_todos_owner_id_title_c", table_name="todos")
@@ -0,0 +1,27 @@
+"""Add owner id index to todos
+
+Revision ID: c7d2e9f14b08
+Revises: a41e8b6c0d23
+Create Date: 2026-10-18 13:41:09.226871
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9f14b08'
+down_revision: Union[str, None] = 'a41e8b6c0d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_todos_owner_id_id", "todos", ["owner_id", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_owner_id_id", table_name="todos")
@@ -0,0 +1,45 @@
+"""Add todo change tracking
+
+Revision ID: e2a6c4d81f95
+Revises: 5b8e1f3a9c62
+Create Date: 2026-10-18 16:48:52.113507
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c4d81f95'
+down_revision: Union[str, None] = '5b8e1f3a9c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("todos", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("todos", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_todos_owner_id_version_id", "todos", ["owner_id", "version", "id"])
+
+    op.create_table(
+        "todo_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("todo_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_todo_tombstones_owner_id_version_todo_id", "todo_tombstones", ["owner_id", "version", "todo_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todo_tombstones_owner_id_version_todo_id", table_name="todo_tombstones")
+    op.drop_table("todo_tombstones")
+    op.drop_index("ix_todos_owner_id_version_id", table_name="todos")
+    op.drop_column("todos", "updated_at")
+    op.drop_column("todos", "version")
@@ -0,0 +1,152 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from sqlalchemy import insert
+from cache import invalidate_todos
+from database import AsyncSessionLocal
+from models import Todos
+from versioning import bump_todo_version
+
+load_dotenv()
+
+# Opt-in group commit for POST /todo: concurrent creates are queued and
+# written by one background task, a batch per transaction, so many requests
+# share a single commit (and fsync).
+TODO_WRITE_BATCHING = os.getenv("TODO_WRITE_BATCHING", "false").lower() == "true"
+TODO_WRITE_BATCH_SIZE = int(os.getenv("TODO_WRITE_BATCH_SIZE", "100"))
+TODO_WRITE_BATCH_DELAY_MS = float(os.getenv("TODO_WRITE_BATCH_DELAY_MS", "5"))
+
+_STOP = object()
+
+
+class TodoWriteBatcher:
+    """Coalesces todo inserts into shared transactions.
+
+    A batch is written once ``max_size`` creates are queued or ``max_delay``
+    seconds after its first one arrived, whichever comes first. Each caller
+    awaits the row it queued. If a batch fails, its rows are retried one
+    transaction each, so one bad row cannot fail the rest.
+    """
+
+    def __init__(self, session_factory, max_size: int, max_delay: float):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.rows = 0
+        self.max_batch = 0
+        self._queue = None
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # The sentinel lets _run write the batch it is holding and everything
+        # queued before it, then return; cancelling would drop that batch.
+        await self._queue.put(_STOP)
+        await self._task
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Todo write batcher stopped"))
+        self._task = None
+
+    async def create(self, owner_id: int, values: dict) -> dict:
+        """Queue a todo for ``owner_id`` and return the row once it is committed."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((owner_id, values, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: list):
+        try:
+            rows = await self._insert(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                _, _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            for item in batch:
+                await self._write([item])
+            return
+
+        self.batches += 1
+        self.rows += len(rows)
+        self.max_batch = max(self.max_batch, len(rows))
+        for (_, _, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(row)
+
+    async def _insert(self, batch: list) -> list[dict]:
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as db:
+            # One version per owner in the batch, as for a bulk create. Each bump
+            # locks the owner's user row until commit, so owners are locked in id
+            # order: batches from different workers can then never deadlock.
+            versions = {}
+            for owner_id in sorted({owner_id for owner_id, _, _ in batch}):
+                versions[owner_id] = await bump_todo_version(db, owner_id)
+
+            rows = [
+                {**values, "owner_id": owner_id, "version": versions[owner_id], "updated_at": now}
+                for owner_id, values, _ in batch
+            ]
+            ids = (await db.scalars(insert(Todos).returning(Todos.id, sort_by_parameter_order=True), rows)).all()
+            await db.commit()
+
+        for owner_id in versions:
+            invalidate_todos(owner_id)
+        return [{"id": todo_id, **row} for todo_id, row in zip(ids, rows)]
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "batches": self.batches,
+            "rows": self.rows,
+            "max_batch": self.max_batch,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+todo_write_batcher = TodoWriteBatcher(
+    AsyncSessionLocal, max_size=TODO_WRITE_BATCH_SIZE, max_delay=TODO_WRITE_BATCH_DELAY_MS / 1000
+)
+
+
+def get_todo_write_batcher():
+    """Dependency for POST /todo: the running batcher, or None when batching is off."""
+    return todo_write_batcher if todo_write_batcher.running else None
@@ -0,0 +1,73 @@
+"""Todo creation throughput with one transaction per create versus the
+TodoWriteBatcher group commit, on a SQLite file.
+
+    python benchmarks/bench_group_commit.py [creates] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from batching import TodoWriteBatcher
+from database import Base
+from models import Todos, Users
+from versioning import bump_todo_version
+
+TODO = {"title": "bench", "description": "bench", "priority": 1, "complete": False}
+
+
+async def one_by_one(session_factory, owner_id: int):
+    async with session_factory() as db:
+        version = await bump_todo_version(db, owner_id)
+        db.add(Todos(**TODO, owner_id=owner_id, version=version))
+        await db.commit()
+
+
+async def run(creates: int, concurrency: int, batched: bool) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/bench.db"
+        sync_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(sync_engine)
+        with sync_engine.begin() as connection:
+            connection.execute(insert(Users), [{"id": owner_id, "username": f"user {owner_id}"} for owner_id in range(concurrency)])
+        sync_engine.dispose()
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30})
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        batcher = TodoWriteBatcher(session_factory, max_size=100, max_delay=0.005)
+        await batcher.start()
+
+        async def client(owner_id: int):
+            for _ in range(creates // concurrency):
+                if batched:
+                    await batcher.create(owner_id, TODO)
+                else:
+                    await one_by_one(session_factory, owner_id)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(owner_id) for owner_id in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        await batcher.stop()
+        await engine.dispose()
+        return creates / elapsed
+
+
+def main():
+    creates = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"{creates} creates from {concurrency} concurrent clients")
+    for name, batched in (("commit per create", False), ("group commit", True)):
+        print(f"  {name:<20} {asyncio.run(run(creates, concurrency, batched)):8.0f} creates/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-row cost of loading and serializing todos as ORM instances versus plain
+column rows.
+
+    python benchmarks/bench_read_path.py [rows] [repeat]
+"""
+import orjson
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models import Todos, Users
+from pydantic import TypeAdapter
+from schemas import TODO_COLUMNS, TodoResponse
+
+todo_list_adapter = TypeAdapter(list[TodoResponse])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(Users), [{"id": 1, "username": "bench"}])
+        db.execute(insert(Todos), [
+            {"title": f"Todo {i}", "description": "Benchmark row", "priority": i % 5 + 1,
+             "complete": bool(i % 2), "owner_id": 1, "version": i}
+            for i in range(rows)
+        ])
+        db.commit()
+
+    def orm():
+        with Session(engine) as db:
+            todos = db.scalars(select(Todos).where(Todos.owner_id == 1)).all()
+            return todo_list_adapter.dump_json(todo_list_adapter.validate_python(todos, from_attributes=True))
+
+    def core():
+        with Session(engine) as db:
+            todos = db.execute(select(*TODO_COLUMNS).where(Todos.owner_id == 1)).all()
+            return orjson.dumps([todo._asdict() for todo in todos])
+
+    print(f"{rows} rows, best of {repeat}")
+    baseline = None
+    for name, fn in {"ORM entities + response model": orm, "Core column rows + orjson": core}.items():
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        per_row = best / rows * 1e6
+        baseline = baseline or per_row
+        print(f"  {name:<40} {per_row:8.2f} us/row  {baseline / per_row:5.1f}x  {peak / rows:7.0f} B/row peak")
+
+
+if __name__ == "__main__":
+    main()
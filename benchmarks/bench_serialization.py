@@ -0,0 +1,63 @@
+"""Per-row serialization cost of a todo list response.
+
+Compares the default FastAPI path (``jsonable_encoder`` over ORM objects, then
+``json.dumps``) with validating through the response models (pydantic
+``TypeAdapter.dump_json``) and with orjson over plain row dicts, which the read
+endpoints use. Validation pays off over ``jsonable_encoder`` but not over
+orjson once rows come from column selects (see bench_read_path.py).
+
+    python benchmarks/bench_serialization.py [rows] [repeat]
+"""
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models import Todos
+from schemas import TodoResponse
+
+todo_list_adapter = TypeAdapter(list[TodoResponse])
+
+
+def make_todos(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        Todos(id=i, title=f"Todo {i}", description="Benchmark row", priority=i % 5 + 1,
+              complete=bool(i % 2), owner_id=1, version=i, updated_at=now)
+        for i in range(1, count + 1)
+    ]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    todos = make_todos(rows)
+    columns = [column.key for column in Todos.__table__.columns]
+    dicts = [{key: getattr(todo, key) for key in columns} for todo in todos]
+
+    cases = {
+        "jsonable_encoder + json.dumps": lambda: json.dumps(jsonable_encoder(todos)).encode(),
+        "TypeAdapter.dump_json (from_attributes)": lambda: todo_list_adapter.dump_json(
+            todo_list_adapter.validate_python(todos, from_attributes=True)),
+        "orjson over row dicts": lambda: orjson.dumps(dicts),
+    }
+
+    print(f"{rows} rows, best of {repeat}")
+    baseline = None
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        per_row = best / rows * 1e6
+        baseline = baseline or per_row
+        print(f"  {name:<42} {per_row:8.2f} us/row  {baseline / per_row:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
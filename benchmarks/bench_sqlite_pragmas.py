@@ -0,0 +1,93 @@
+"""Mixed read/write throughput on a SQLite file with and without the
+SQLITE_PRAGMAS connection profile.
+
+Reader threads page through one owner's todos while writer threads insert and
+commit single rows, the shape of normal API traffic.
+
+    python benchmarks/bench_sqlite_pragmas.py [seconds] [readers] [writers]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, exc, insert, select
+
+from database import SQLITE_PRAGMAS, Base, apply_sqlite_pragmas
+from models import Todos, Users
+
+SEED_ROWS = 5000
+
+
+def run(pragmas: dict, seconds: float, readers: int, writers: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db", pool_size=readers + writers,
+                               connect_args={"timeout": 5})
+        apply_sqlite_pragmas(engine, pragmas)
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(Users), [{"id": 1, "username": "bench"}])
+            connection.execute(insert(Todos), [
+                {"title": f"todo {i}", "description": "bench", "priority": i % 5 + 1, "complete": False,
+                 "owner_id": 1, "version": 0}
+                for i in range(SEED_ROWS)
+            ])
+
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+        page = select(Todos.id, Todos.title, Todos.priority).where(Todos.owner_id == 1).order_by(
+            Todos.priority, Todos.id).limit(50)
+
+        def reader():
+            done = 0
+            while time.perf_counter() < deadline:
+                with engine.connect() as connection:
+                    connection.execute(page).all()
+                done += 1
+            with lock:
+                counts["reads"] += done
+
+        def writer():
+            done = errors = 0
+            while time.perf_counter() < deadline:
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(Todos).values(
+                            title="new", description="bench", priority=1, complete=False, owner_id=1, version=0))
+                    done += 1
+                except exc.OperationalError:
+                    errors += 1
+            with lock:
+                counts["writes"] += done
+                counts["errors"] += errors
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {key: value / seconds if key != "errors" else value for key, value in counts.items()}
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    print(f"{seconds:g}s, {readers} readers, {writers} writers")
+    for name, pragmas in (("defaults", {}), ("SQLITE_PRAGMAS", SQLITE_PRAGMAS)):
+        result = run(pragmas, seconds, readers, writers)
+        print(f"  {name:<16} {result['reads']:9.0f} reads/s  {result['writes']:8.0f} writes/s  "
+              f"{result['errors']} lock errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dotenv import load_dotenv
+from database import session_router
+
+load_dotenv()
+
+TODO_LIST_CACHE_SIZE = int(os.getenv("TODO_LIST_CACHE_SIZE", "1024"))
+TODO_LIST_CACHE_TTL = float(os.getenv("TODO_LIST_CACHE_TTL", "30"))
+TODO_SUGGEST_CACHE_SIZE = int(os.getenv("TODO_SUGGEST_CACHE_SIZE", "4096"))
+TODO_SUGGEST_CACHE_TTL = float(os.getenv("TODO_SUGGEST_CACHE_TTL", "60"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire individually."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class ResponseCache:
+    """Serialized responses cached per owner and dropped together on writes.
+
+    Entries are namespaced by a per-owner generation token. Invalidating drops
+    the token, which makes every cached variant for that owner unreachable at
+    once, and a read racing a write can only store under the stale token. The
+    backend only needs ``get``/``set``/``delete``/``clear``, so an external
+    store can replace the in-process ``TTLCache``.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def generation(self, owner_id: int) -> str:
+        token = self.backend.get(("generation", owner_id))
+        if token is None:
+            token = uuid.uuid4().hex
+            self.backend.set(("generation", owner_id), token)
+        return token
+
+    def get(self, owner_id: int, generation: str, variant):
+        return self.backend.get((owner_id, generation, variant))
+
+    def set(self, owner_id: int, generation: str, variant, body: bytes):
+        self.backend.set((owner_id, generation, variant), body)
+
+    def invalidate(self, owner_id: int):
+        self.backend.delete(("generation", owner_id))
+
+    def clear(self):
+        self.backend.clear()
+
+
+todo_list_cache = ResponseCache(TTLCache(maxsize=TODO_LIST_CACHE_SIZE, ttl=TODO_LIST_CACHE_TTL))
+todo_suggest_cache = ResponseCache(TTLCache(maxsize=TODO_SUGGEST_CACHE_SIZE, ttl=TODO_SUGGEST_CACHE_TTL))
+
+
+def invalidate_todos(owner_id: int):
+    """Forget every cached view of ``owner_id``'s todos and keep their reads on
+    the primary for a while; call after the write commits."""
+    todo_list_cache.invalidate(owner_id)
+    todo_suggest_cache.invalidate(owner_id)
+    session_router.record_write(owner_id)
@@ -1,18 +1,333 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, exc, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 import os
+import threading
+import time
+from contextlib import asynccontextmanager
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Applied to every pool; size, overflow and timeout only mean something for
+# queue pools, so backends whose default is another pool ignore them.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Connection profile for SQLite deployments: WAL lets readers run alongside
+# the single writer, and synchronous=NORMAL is durable under WAL except for
+# the last transactions before a power loss. Set SQLITE_TUNING=false to keep
+# SQLite's defaults.
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() == "true"
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Optional read replica for read-only handlers. After a user writes, their
+# reads stay on the primary for REPLICA_STICKINESS_SECONDS so they see it.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+REPLICA_STICKINESS_SECONDS = float(os.getenv("REPLICA_STICKINESS_SECONDS", "5"))
+
+# Async driver used by the request handlers for each sync backend.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url):
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's connection pool.
+
+    ``acquire_seconds_*`` time every ``Pool.connect`` call, through the pool
+    class returned from ``pool_class``: queue waits, but also opening new
+    connections and attempts that time out, so the average is over
+    ``acquires`` (every call), not just successful checkouts. Everything else
+    comes from pool events registered by ``attach``.
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.acquires = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def pool_class(self, base):
+        metrics = self
+
+        class TimedPool(base):
+            def connect(self):
+                started = time.perf_counter()
+                try:
+                    return super().connect()
+                except exc.TimeoutError:
+                    with metrics._lock:
+                        metrics.timeouts += 1
+                    raise
+                finally:
+                    metrics._record_acquire(time.perf_counter() - started)
+
+        TimedPool.__name__ = base.__name__
+        return TimedPool
+
+    def _record_acquire(self, seconds: float):
+        with self._lock:
+            self.acquires += 1
+            self.acquire_seconds_total += seconds
+            self.acquire_seconds_max = max(self.acquire_seconds_max, seconds)
+
+    def attach(self, engine):
+        """Start counting on ``engine`` (the sync engine behind an async one)."""
+
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.checked_out += 1
+                self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+                if isinstance(engine.pool, QueuePool):
+                    self.peak_overflow = max(self.peak_overflow, engine.pool.overflow())
+
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checked_out -= 1
+
+        event.listen(engine, "connect", on_connect)
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+        self._engine = engine
+
+    def stats(self) -> dict:
+        pool = self._engine.pool if self._engine is not None else None
+        queue_pool = isinstance(pool, QueuePool)
+        return {
+            "pool": type(pool).__name__ if pool is not None else None,
+            "size": pool.size() if queue_pool else None,
+            "checked_out": self.checked_out,
+            "overflow": max(pool.overflow(), 0) if queue_pool else None,
+            "peak_checked_out": self.peak_checked_out,
+            "peak_overflow": max(self.peak_overflow, 0),
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "acquires": self.acquires,
+            "acquire_seconds_total": round(self.acquire_seconds_total, 6),
+            "acquire_seconds_max": round(self.acquire_seconds_max, 6),
+            "acquire_seconds_avg": round(self.acquire_seconds_total / self.acquires, 6) if self.acquires else 0.0,
+        }
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict = SQLITE_PRAGMAS):
+    """Run ``pragmas`` on every new connection of a SQLite ``engine``."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+
+
+def pool_options(url, metrics: PoolMetrics) -> dict:
+    """``create_engine`` pool arguments for ``url`` from the DB_POOL_* settings."""
+    url = make_url(url)
+    base = url.get_dialect().get_pool_class(url)
+    options = {"poolclass": metrics.pool_class(base), "pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if issubclass(base, QueuePool):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+engine_pool_metrics = PoolMetrics()
+async_engine_pool_metrics = PoolMetrics()
+
+# The sync engine is kept for metadata creation, Alembic and scripts;
+# request handlers go through the async engine below.
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, engine_pool_metrics))
+engine_pool_metrics.attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, async_engine_pool_metrics))
+async_engine_pool_metrics.attach(async_engine.sync_engine)
+
+if SQLITE_TUNING:
+    apply_sqlite_pragmas(engine)
+    apply_sqlite_pragmas(async_engine.sync_engine)
+
+# expire_on_commit=False: handlers return ORM objects after committing, and an
+# expired attribute cannot be lazily reloaded outside the async session.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+replica_engine_pool_metrics = None
+ReplicaSessionLocal = AsyncSessionLocal
+
+if REPLICA_DATABASE_URL:
+    ASYNC_REPLICA_DATABASE_URL = to_async_url(REPLICA_DATABASE_URL)
+    replica_engine_pool_metrics = PoolMetrics()
+    replica_async_engine = create_async_engine(
+        ASYNC_REPLICA_DATABASE_URL, **pool_options(ASYNC_REPLICA_DATABASE_URL, replica_engine_pool_metrics)
+    )
+    replica_engine_pool_metrics.attach(replica_async_engine.sync_engine)
+    if SQLITE_TUNING:
+        apply_sqlite_pragmas(replica_async_engine.sync_engine)
+    ReplicaSessionLocal = async_sessionmaker(bind=replica_async_engine, autoflush=False, expire_on_commit=False)
+
+
+class SessionRouter:
+    """Routes read-only handlers to the replica, except for recent writers.
+
+    Stickiness is tracked in-process, so read-your-writes holds for requests
+    served by the worker that took the write.
+    """
+
+    def __init__(self, primary, replica, stickiness: float):
+        self.primary = primary
+        self.replica = replica
+        self.stickiness = stickiness
+        self._sticky_until = {}
+        self._prune_at = 1024
+        self._lock = threading.Lock()
+
+    def record_write(self, user_id):
+        """Pin ``user_id``'s reads to the primary; call after the write commits."""
+        if self.replica is self.primary or user_id is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sticky_until[user_id] = now + self.stickiness
+            if len(self._sticky_until) >= self._prune_at:
+                self._sticky_until = {key: until for key, until in self._sticky_until.items() if until > now}
+                self._prune_at = max(1024, 2 * len(self._sticky_until))
+
+    def for_read(self, user_id):
+        until = self._sticky_until.get(user_id)
+        if until is not None and until > time.monotonic():
+            return self.primary
+        return self.replica
+
+
+session_router = SessionRouter(AsyncSessionLocal, ReplicaSessionLocal, REPLICA_STICKINESS_SECONDS)
+
 Base = declarative_base()
 
 
+class SessionMetrics:
+    """Per-request session counters: sessions handed out, how many of them
+    ever reached the database, and how many connections they checked out."""
+
+    def __init__(self):
+        self.sessions = 0
+        self.sessions_connected = 0
+        self.connections = 0
+        self.max_connections_per_session = 0
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def scope(self, session_factory):
+        async with session_factory() as db:
+            try:
+                yield db
+            finally:
+                self._record(db.sync_session.info.get("connections", 0))
+
+    def _record(self, connections: int):
+        with self._lock:
+            self.sessions += 1
+            self.sessions_connected += connections > 0
+            self.connections += connections
+            self.max_connections_per_session = max(self.max_connections_per_session, connections)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "sessions_connected": self.sessions_connected,
+            "connections": self.connections,
+            "max_connections_per_session": self.max_connections_per_session,
+        }
+
+
+@event.listens_for(Session, "after_begin")
+def _count_connection(session, transaction, connection):
+    # A session begins once per connection it checks out: on its first query
+    # and again on the first query after each commit or rollback.
+    session.info["connections"] = session.info.get("connections", 0) + 1
+
+
+session_metrics = SessionMetrics()
+
+
+async def get_db():
+    """Request-scoped session shared by every router.
+
+    Sessions connect lazily, so a request rejected by auth or answered from a
+    cache never checks out a connection.
+    """
+    async with session_metrics.scope(AsyncSessionLocal) as db:
+        yield db
+
+
+def get_session_factory():
+    """Dependency for handlers that must open sessions themselves, such as
+    streaming responses that keep reading after the request's own session
+    has been closed."""
+    return AsyncSessionLocal
+
+
+def get_session_router():
+    """Dependency for read-only handlers that may be served by the replica."""
+    return session_router
+
+
+async def execute_returning(db, statement, *columns):
+    """Run an UPDATE or DELETE and return ``columns`` of the rows it touched.
+
+    Dialects with RETURNING do this in a single round trip; elsewhere the rows
+    are selected first, inside the same transaction.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.update_returning if statement.is_update else dialect.delete_returning:
+        result = await db.execute(statement.returning(*columns), execution_options={"synchronize_session": False})
+        return result.all()
+
+    rows = (await db.execute(select(*columns).where(statement.whereclause))).all()
+    await db.execute(statement, execution_options={"synchronize_session": False})
+    return rows
+
+
 
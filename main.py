@@ -1,14 +1,44 @@
-from fastapi import FastAPI
-from database import Base, engine
+from contextlib import asynccontextmanager
+from typing import Annotated
+from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.responses import ORJSONResponse
+import batching
+from cache import todo_list_cache, todo_suggest_cache
+from database import Base, async_engine_pool_metrics, engine, replica_engine_pool_metrics, session_metrics
 from routers import auth, todos, admin, users
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if batching.TODO_WRITE_BATCHING:
+        await batching.todo_write_batcher.start()
+    yield
+    await batching.todo_write_batcher.stop()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 Base.metadata.create_all(bind=engine)
 
 @app.get("/healthy")
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+def metrics(user: Annotated[dict, Depends(auth.get_current_user)]):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    if user.get("role").casefold() != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not authorized")
+
+    return {
+        "token_cache": auth.token_cache.stats(),
+        "todo_list_cache": todo_list_cache.backend.stats(),
+        "todo_suggest_cache": todo_suggest_cache.backend.stats(),
+        "db_sessions": session_metrics.stats(),
+        "db_pool": async_engine_pool_metrics.stats(),
+        "db_replica_pool": replica_engine_pool_metrics.stats() if replica_engine_pool_metrics else None,
+        "todo_write_batcher": batching.todo_write_batcher.stats(),
+    }
+
 app.include_router(auth.router)
 app.include_router(todos.router)
 app.include_router(admin.router)
@@ -1,7 +1,12 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import DDL, Boolean, Column, DateTime, Integer, String, ForeignKey, Index, event
 from database import Base
 
 
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
 class Users(Base):
 
     __tablename__ = "users"
@@ -15,14 +20,128 @@ class Users(Base):
     is_active = Column(Boolean, default=True)
     role = Column(String)
     phone_number = Column(String)
+    todo_version = Column(Integer, nullable=False, default=0, server_default="0")
 
 class Todos(Base):
 
     __tablename__ = "todos"
-    
+    __table_args__ = (
+        Index("ix_todos_owner_id_priority_id", "owner_id", "priority", "id"),
+        Index("ix_todos_owner_id_complete_priority_id", "owner_id", "complete", "priority", "id"),
+        Index("ix_todos_owner_id_id", "owner_id", "id"),
+        Index("ix_todos_owner_id_version_id", "owner_id", "version", "id"),
+        Index("ix_todos_owner_id_title_id", "owner_id", "title", "id"),
+        # Tombstones are keyed by todo id, so SQLite must never hand a deleted
+        # id to a new todo, as it does for a plain INTEGER PRIMARY KEY.
+        {"sqlite_autoincrement": True},
+    )
+
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
+    title = Column(String, index=True, nullable=False)
     description = Column(String)
-    priority = Column(Integer)
+    priority = Column(Integer, nullable=False)
     complete = Column(Boolean, default=False)
-    owner_id = Column(Integer, ForeignKey("users.id"))
\ No newline at end of file
+    owner_id = Column(Integer, ForeignKey("users.id"))
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+# Full-text search over title and description, scoped by owner inside the
+# index so a search reads only the caller's postings. SQLite keeps an
+# external-content FTS5 table in step with todos through triggers, so every
+# write path (ORM, Core bulk statements, imports) is covered; owner_id is an
+# FTS5 column that queries filter on and bm25 gives no weight. Postgres needs no
+# shadow table: a btree_gin index over (owner_id, tsvector expression), which
+# search queries repeat verbatim.
+TODO_SEARCH_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+TODO_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5("
+        "title, description, owner_id, content='todos', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN "
+        "INSERT INTO todos_fts(rowid, title, description, owner_id) "
+        "VALUES (new.id, new.title, new.description, new.owner_id); END",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN "
+        "INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) "
+        "VALUES ('delete', old.id, old.title, old.description, old.owner_id); END",
+        "CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description, owner_id ON todos BEGIN "
+        "INSERT INTO todos_fts(todos_fts, rowid, title, description, owner_id) "
+        "VALUES ('delete', old.id, old.title, old.description, old.owner_id); "
+        "INSERT INTO todos_fts(rowid, title, description, owner_id) "
+        "VALUES (new.id, new.title, new.description, new.owner_id); END",
+    ],
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        f"CREATE INDEX IF NOT EXISTS ix_todos_owner_id_search ON todos USING gin (owner_id, ({TODO_SEARCH_VECTOR}))",
+    ],
+}
+
+# Per-owner counts by (complete, priority), kept current by triggers on todos
+# so statistics can be read without touching the todos themselves. NULL
+# completion and priority are counted as false and 0.
+TODO_COUNTS_DDL = {
+    "sqlite": [
+        "CREATE TRIGGER IF NOT EXISTS todo_counts_insert AFTER INSERT ON todos WHEN new.owner_id IS NOT NULL BEGIN "
+        "INSERT INTO todo_counts (owner_id, complete, priority, count) "
+        "VALUES (new.owner_id, coalesce(new.complete, 0), coalesce(new.priority, 0), 1) "
+        "ON CONFLICT (owner_id, complete, priority) DO UPDATE SET count = count + 1; END",
+        "CREATE TRIGGER IF NOT EXISTS todo_counts_delete AFTER DELETE ON todos WHEN old.owner_id IS NOT NULL BEGIN "
+        "UPDATE todo_counts SET count = count - 1 WHERE owner_id = old.owner_id "
+        "AND complete = coalesce(old.complete, 0) AND priority = coalesce(old.priority, 0); END",
+        "CREATE TRIGGER IF NOT EXISTS todo_counts_update AFTER UPDATE OF owner_id, complete, priority ON todos BEGIN "
+        "UPDATE todo_counts SET count = count - 1 WHERE owner_id = old.owner_id "
+        "AND complete = coalesce(old.complete, 0) AND priority = coalesce(old.priority, 0); "
+        "INSERT INTO todo_counts (owner_id, complete, priority, count) "
+        "SELECT new.owner_id, coalesce(new.complete, 0), coalesce(new.priority, 0), 1 WHERE new.owner_id IS NOT NULL "
+        "ON CONFLICT (owner_id, complete, priority) DO UPDATE SET count = count + 1; END",
+    ],
+    "postgresql": [
+        "CREATE OR REPLACE FUNCTION todo_counts_apply() RETURNS trigger AS $$ BEGIN "
+        "IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.owner_id IS NOT NULL THEN "
+        "UPDATE todo_counts SET count = count - 1 WHERE owner_id = OLD.owner_id "
+        "AND complete = coalesce(OLD.complete, false) AND priority = coalesce(OLD.priority, 0); END IF; "
+        "IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.owner_id IS NOT NULL THEN "
+        "INSERT INTO todo_counts (owner_id, complete, priority, count) "
+        "VALUES (NEW.owner_id, coalesce(NEW.complete, false), coalesce(NEW.priority, 0), 1) "
+        "ON CONFLICT (owner_id, complete, priority) DO UPDATE SET count = todo_counts.count + 1; END IF; "
+        "RETURN NULL; END $$ LANGUAGE plpgsql",
+        "DROP TRIGGER IF EXISTS todo_counts_apply ON todos",
+        "CREATE TRIGGER todo_counts_apply AFTER INSERT OR DELETE OR UPDATE OF owner_id, complete, priority "
+        "ON todos FOR EACH ROW EXECUTE FUNCTION todo_counts_apply()",
+    ],
+}
+
+# Title prefix filters compare titles as "C" on Postgres (see routers/todos.py),
+# which the default-collation (owner_id, title, id) index cannot serve.
+TODO_TITLE_DDL = {
+    "postgresql": [
+        'CREATE INDEX IF NOT EXISTS ix_todos_owner_id_title_c ON todos (owner_id, (title COLLATE "C"), id)',
+    ],
+}
+
+for _ddl in (TODO_SEARCH_DDL, TODO_COUNTS_DDL, TODO_TITLE_DDL):
+    for _dialect, _statements in _ddl.items():
+        for _statement in _statements:
+            event.listen(Todos.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+class TodoTombstones(Base):
+
+    __tablename__ = "todo_tombstones"
+    __table_args__ = (
+        Index("ix_todo_tombstones_owner_id_version_todo_id", "owner_id", "version", "todo_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    todo_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=utcnow)
+
+class TodoCounts(Base):
+
+    __tablename__ = "todo_counts"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    complete = Column(Boolean, primary_key=True)
+    priority = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,55 +1,122 @@
-from fastapi import APIRouter, HTTPException, Depends, Path, status
+from fastapi import APIRouter, HTTPException, Depends, Path, Query, Request, status
 from pydantic import BaseModel, Field
-from database import SessionLocal
+from cache import invalidate_todos
+from database import execute_returning, get_db, get_session_factory, session_router
 from models import Todos, Users
-from typing import Annotated
-from sqlalchemy.orm import Session
-from .auth import get_current_user
+from fastapi.responses import ORJSONResponse
+from schemas import TODO_EXPORT_COLUMNS, PartialTodoPage, project, todo_fields, with_keys
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from stats import todo_stats
+from streaming import stream_rows
+from versioning import record_deletions
+from typing import Annotated, Literal
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from .auth import get_current_user, get_read_db
 
 router = APIRouter(
     prefix="/admin",
     tags=["admin"],
 )
   
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+session_factory_dependency = Annotated[async_sessionmaker, Depends(get_session_factory)]
+user_dependency = Annotated[dict, Depends(get_current_user)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
 
+def todo_filters(owner_id: int | None = Query(default=None, gt=0),
+                 complete: bool | None = None,
+                 priority_min: int | None = Query(default=None, gt=0, lt=6),
+                 priority_max: int | None = Query(default=None, gt=0, lt=6)):
+    conditions = []
+    if owner_id is not None:
+        conditions.append(Todos.owner_id == owner_id)
+    if complete is not None:
+        conditions.append(Todos.complete == complete)
+    if priority_min is not None:
+        conditions.append(Todos.priority >= priority_min)
+    if priority_max is not None:
+        conditions.append(Todos.priority <= priority_max)
+    return conditions
 
-db_dependency = Annotated[Session, Depends(get_db)]
-user_dependency = Annotated[dict, Depends(get_current_user)]
+filters_dependency = Annotated[list, Depends(todo_filters)]
+fields_dependency = Annotated[tuple, Depends(todo_fields)]
 
-@router.get('/todos', status_code=status.HTTP_200_OK)
-def read_all(db: db_dependency, user: user_dependency):
+@router.get('/todos', status_code=status.HTTP_200_OK, response_model=PartialTodoPage)
+async def read_all(db: read_db_dependency, user: user_dependency, filters: filters_dependency, columns: fields_dependency,
+                   limit: int = Query(default=DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+                   after: str | None = None):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
     if user.get("role").casefold() != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not authorized")
     
-    return db.query(Todos).all()
+    # Always paginated: keyset over the primary key, so no request loads more
+    # than one page however large the table is.
+    query = select(*with_keys(columns, Todos.id)).where(*filters)
+    if after is not None:
+        (todo_id,) = decode_cursor(after, (int,))
+        query = query.where(Todos.id > todo_id)
+
+    todos = (await db.execute(query.order_by(Todos.id).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(todos) > limit:
+        todos = todos[:limit]
+        next_cursor = encode_cursor(todos[-1].id)
+
+    return ORJSONResponse({"items": project(todos, columns), "next_cursor": next_cursor})
+
+@router.get('/todos/stats', status_code=status.HTTP_200_OK)
+async def read_stats(db: read_db_dependency, user: user_dependency, owner_id: int | None = Query(default=None, gt=0)):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    
+    if user.get("role").casefold() != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not authorized")
+
+    return await todo_stats(db, owner_id)
+
+@router.get('/todos/export', status_code=status.HTTP_200_OK)
+async def export_todos(request: Request, session_factory: session_factory_dependency, user: user_dependency,
+                       filters: filters_dependency,
+                       export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format")):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    
+    if user.get("role").casefold() != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not authorized")
+
+    query = (
+        select(*TODO_EXPORT_COLUMNS)
+        .where(*filters)
+        .order_by(Todos.id)
+    )
+
+    return stream_rows(request, session_factory, query, export_format, "todos")
 
 
 
 @router.delete('/todos/{todo_id}', status_code=status.HTTP_204_NO_CONTENT)
-def delete_todo(db: db_dependency, user: user_dependency, todo_id: int = Path(gt=0)):
+async def delete_todo(db: db_dependency, user: user_dependency, todo_id: int = Path(gt=0)):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
     if user.get("role").casefold() != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not authorized")
     
-    todo_model: Todos | None = db.query(Todos).filter(Todos.id == todo_id).first()
+    deleted = await execute_returning(db, delete(Todos).where(Todos.id == todo_id), Todos.id, Todos.owner_id)
 
-    if todo_model is None:
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
-
-    db.query(Todos).filter(Todos.id == todo_id).delete(synchronize_session=False)
     
-    db.commit()
+    for row in deleted:
+        await record_deletions(db, row.owner_id, [row.id])
+    await db.commit()
+    for row in deleted:
+        invalidate_todos(row.owner_id)
+    session_router.record_write(user.get("user_id"))
 
     
 
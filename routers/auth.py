@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
+import hashlib
+import time
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from starlette import status
-from database import SessionLocal
+from cache import TTLCache
+from database import SessionRouter, get_db, get_session_router, session_metrics
 from models import Users
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from passwords import hash_password, verify_password
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 import os
 from dotenv import load_dotenv
@@ -21,24 +25,21 @@ router = APIRouter(
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
 
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
-oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/token")  
+# Verified claims keyed by the SHA-256 of the raw token; each entry lives until
+# the token's own exp, so a hit never outlives what jwt.decode would accept.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=timedelta(days=1).total_seconds())
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/token")  
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
-def authenticate_user(username: str, password: str, db: db_dependency):
-    user: Users | None = db.query(Users).filter(Users.username == username).first()
+async def authenticate_user(username: str, password: str, db: db_dependency):
+    user: Users | None = await db.scalar(select(Users).where(Users.username == username))
     if not user:
         return False
-    if not bcrypt_context.verify(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return False
     return user
 
@@ -57,6 +58,11 @@ def create_access_token(username: str, user_id: int, role: str, expires_delta: t
     return encoded_jwt
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
+    token_digest = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(token_digest)
+    if claims is not None:
+        return dict(claims)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -66,10 +72,20 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
         if username is None or user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
         
-        return {"username": username, "user_id": user_id, "role": role}
+        claims = {"username": username, "user_id": user_id, "role": role}
+        if payload.get("exp") is not None:
+            token_cache.set(token_digest, claims, ttl=payload["exp"] - time.time())
+
+        return dict(claims)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
+async def get_read_db(user: Annotated[dict, Depends(get_current_user)],
+                      sessions: Annotated[SessionRouter, Depends(get_session_router)]):
+    """Session for read-only handlers: the replica, or the primary for recent writers."""
+    async with session_metrics.scope(sessions.for_read(user.get("user_id") if user else None)) as db:
+        yield db
+
 
 
 class CreateUserRequest(BaseModel):
@@ -116,20 +132,19 @@ async def create_user(db: db_dependency, create_user_request: CreateUserRequest)
         username = create_user_request.username,
         first_name = create_user_request.first_name,
         last_name = create_user_request.last_name,
-        hashed_password = bcrypt_context.hash(create_user_request.password),
+        hashed_password = await hash_password(create_user_request.password),
         role = create_user_request.role,
         is_active = True,
         phone_number = create_user_request.phone_number
     )
 
     db.add(create_user_model)
-    db.commit()
-    db.refresh(create_user_model)
+    await db.commit()
 
 @router.post('/token', status_code=status.HTTP_200_OK, response_model=Token)
 async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: db_dependency):
 
-    user: Users | None = authenticate_user(form_data.username, form_data.password, db)
+    user: Users | None = await authenticate_user(form_data.username, form_data.password, db)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail ='Could not validate credentials')
@@ -1,25 +1,57 @@
-from fastapi import APIRouter, HTTPException, Depends, Path, status
-from pydantic import BaseModel, Field
-from database import SessionLocal
-from models import Todos
-from typing import Annotated
-from sqlalchemy.orm import Session
-from .auth import get_current_user
+import codecs
+import csv
+import heapq
+import io
+import json
+import orjson
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from fastapi import APIRouter, Body, HTTPException, Depends, Header, Path, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, ValidationError
+from batching import TodoWriteBatcher, get_todo_write_batcher
+from cache import invalidate_todos, todo_list_cache, todo_suggest_cache
+from database import execute_returning, get_db, get_session_factory
+from models import TodoTombstones, Todos
+from schemas import (TODO_COLUMNS, TODO_EXPORT_COLUMNS, PartialTodoPage, PartialTodoResponse, TodoChanges,
+                     TodoResponse, project, todo_fields, with_keys)
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from search import search_query
+from stats import todo_stats
+from streaming import stream_rows
+from versioning import bump_todo_version, etag_matches, record_deletions, todo_etag, todo_version
+from typing import Annotated, Literal
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from .auth import get_current_user, get_read_db
 
 router = APIRouter(
     tags=["todos"],
 )
   
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+session_factory_dependency = Annotated[async_sessionmaker, Depends(get_session_factory)]
+user_dependency = Annotated[dict, Depends(get_current_user)]
+fields_dependency = Annotated[tuple, Depends(todo_fields)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
 
+BULK_MAX_ITEMS = int(os.getenv("TODO_BULK_MAX_ITEMS", "1000"))
+IMPORT_BATCH_SIZE = int(os.getenv("TODO_IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_REPORTED_ERRORS = 100
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+IMPORT_COLUMNS = ("title", "description", "priority", "complete", "owner_id", "version", "updated_at")
 
-db_dependency = Annotated[Session, Depends(get_db)]
-user_dependency = Annotated[dict, Depends(get_current_user)]
+# Keyset sort keys for GET /, each the tail of an (owner_id, ...) index, and
+# the cursor value types they encode to. The columns are NOT NULL: a row
+# tuple with a NULL would neither encode to a valid cursor nor compare.
+SORT_KEYS = {
+    "priority": ((Todos.priority, Todos.id), (int, int)),
+    "id": ((Todos.id,), (int,)),
+    "title": ((Todos.title, Todos.id), (str, int)),
+}
 
 class TodoRequest(BaseModel):
     title: str = Field(min_length=3)
@@ -38,35 +70,251 @@ class TodoRequest(BaseModel):
         }
     }
 
-@router.get('/', status_code=status.HTTP_200_OK)
-def read_all(db: db_dependency, user: user_dependency):
+class TodoBulkUpdateRequest(TodoRequest):
+    id: int = Field(gt=0)
+
+class TodoBulkDeleteRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+@router.get('/', status_code=status.HTTP_200_OK, response_model=list[PartialTodoResponse] | PartialTodoPage)
+async def read_all(db: read_db_dependency, user: user_dependency, columns: fields_dependency,
+                   limit: int | None = Query(default=None, gt=0, le=MAX_PAGE_SIZE),
+                   after: str | None = None,
+                   complete: bool | None = None,
+                   priority_min: int | None = Query(default=None, gt=0, lt=6),
+                   priority_max: int | None = Query(default=None, gt=0, lt=6),
+                   title_prefix: str | None = Query(default=None, min_length=1, max_length=100),
+                   sort: Literal["priority", "id", "title"] = "priority",
+                   if_none_match: Annotated[str | None, Header()] = None):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    return db.query(Todos).filter(Todos.owner_id == user.get("user_id")).all()
+    owner_id = user.get("user_id")
+    generation = todo_list_cache.generation(owner_id)
+    filters = (complete, priority_min, priority_max, title_prefix)
+    variant = (limit, after, sort, filters, tuple(column.key for column in columns))
+    cached = todo_list_cache.get(owner_id, generation, variant)
+
+    if cached is not None:
+        etag, body = cached
+    else:
+        # Read the version before the rows: a write landing in between then
+        # only costs the client one extra download, never a missed change.
+        etag, body = todo_etag(owner_id, await todo_version(db, owner_id), columns), None
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    if body is None:
+        conditions = _todo_conditions(db.get_bind().dialect.name, *filters)
+        body = await _read_todos(db, owner_id, columns, conditions, sort, limit, after)
+        todo_list_cache.set(owner_id, generation, variant, (etag, body))
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+def _title_key(dialect: str):
+    # Prefix ranges only bound a prefix under byte order. SQLite compares with
+    # BINARY already; Postgres's linguistic collations skip punctuation at
+    # first, so there titles are compared as "C", backed by ix_todos_owner_id_title_c.
+    return Todos.title.collate("C") if dialect == "postgresql" else Todos.title
+
+def _todo_conditions(dialect: str, complete: bool | None, priority_min: int | None, priority_max: int | None,
+                     title_prefix: str | None) -> list:
+    conditions = []
+    if complete is not None:
+        conditions.append(Todos.complete == complete)
+    if priority_min is not None:
+        conditions.append(Todos.priority >= priority_min)
+    if priority_max is not None:
+        conditions.append(Todos.priority <= priority_max)
+    if title_prefix is not None:
+        # The half-open range is what lets an (owner_id, title) index serve the
+        # prefix; LIKE then drops rows the range lets through, e.g. under
+        # SQLite's case-insensitive LIKE it keeps the match case-sensitive.
+        title = _title_key(dialect)
+        conditions.append(title >= title_prefix)
+        if ord(title_prefix[-1]) < sys.maxunicode:
+            conditions.append(title < title_prefix[:-1] + chr(ord(title_prefix[-1]) + 1))
+        conditions.append(Todos.title.startswith(title_prefix, autoescape=True))
+    return conditions
 
+async def _read_todos(db: AsyncSession, owner_id: int, columns: tuple, conditions: list, sort: str,
+                      limit: int | None, after: str | None) -> bytes:
+    keys, cursor_types = SORT_KEYS[sort]
 
-@router.get('/todo/{todo_id}', status_code=status.HTTP_200_OK)
-async def get_todo_by_id(db: db_dependency, user: user_dependency, todo_id: int = Path(gt=0)):
+    # The selected columns mirror TodoResponse fields, so the rows go straight
+    # to JSON bytes without building ORM entities or validating models.
+    if limit is None and after is None:
+        todos = (await db.execute(
+            select(*columns).where(Todos.owner_id == owner_id).where(*conditions).order_by(*keys)
+        )).all()
+        return orjson.dumps([todo._asdict() for todo in todos])
+
+    query = select(*with_keys(columns, *keys)).where(Todos.owner_id == owner_id).where(*conditions)
+
+    # Keyset pagination over the sort key, served by the matching (owner_id, ...)
+    # index, so every page is an index range scan no matter how deep the client goes.
+    if after is not None:
+        query = query.where(tuple_(*keys) > tuple_(*decode_cursor(after, cursor_types)))
+
+    page_size = limit or DEFAULT_PAGE_SIZE
+    todos = (await db.execute(query.order_by(*keys).limit(page_size + 1))).all()
+
+    next_cursor = None
+    if len(todos) > page_size:
+        todos = todos[:page_size]
+        last = todos[-1]._mapping
+        next_cursor = encode_cursor(*(last[key.key] for key in keys))
+
+    return orjson.dumps({"items": project(todos, columns), "next_cursor": next_cursor})
+
+
+@router.get('/todos/search', status_code=status.HTTP_200_OK, response_model=PartialTodoPage)
+async def search_todos(db: read_db_dependency, user: user_dependency, columns: fields_dependency,
+                       q: str = Query(min_length=1, max_length=200, pattern=r"\w"),
+                       limit: int = Query(default=DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+                       after: str | None = None):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    query, rank = search_query(db.get_bind().dialect.name, q, user.get("user_id"), with_keys(columns, Todos.id))
+
+    # Best matches first; the (rank, id) keyset keeps deep pages as cheap as the first.
+    if after is not None:
+        query = query.where(tuple_(rank, Todos.id) > tuple_(*decode_cursor(after, (float, int))))
+
+    todos = (await db.execute(query.order_by(rank, Todos.id).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(todos) > limit:
+        todos = todos[:limit]
+        last = todos[-1]._mapping
+        next_cursor = encode_cursor(last["rank"], last["id"])
+
+    return ORJSONResponse({"items": project(todos, columns), "next_cursor": next_cursor})
+
+@router.get('/todos/suggest', status_code=status.HTTP_200_OK)
+async def suggest_titles(db: read_db_dependency, user: user_dependency,
+                         prefix: str = Query(min_length=1, max_length=100),
+                         limit: int = Query(default=SUGGEST_DEFAULT_LIMIT, gt=0, le=SUGGEST_MAX_LIMIT)):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    owner_id = user.get("user_id")
+    generation = todo_suggest_cache.generation(owner_id)
+    titles = todo_suggest_cache.get(owner_id, generation, (prefix, limit))
+
+    if titles is None:
+        # Typing extends the prefix one keystroke at a time. A shorter prefix
+        # that came back with fewer than ``limit`` titles holds every match,
+        # so the longer prefix can be answered from it without a query.
+        for length in range(len(prefix) - 1, 0, -1):
+            shorter = todo_suggest_cache.get(owner_id, generation, (prefix[:length], limit))
+            if shorter is not None and len(shorter) < limit:
+                titles = [title for title in shorter if title.startswith(prefix)]
+                break
+
+    if titles is None:
+        # An index range scan over (owner_id, title) that stops after ``limit``
+        # distinct titles, already in (byte) order.
+        dialect = db.get_bind().dialect.name
+        title = _title_key(dialect)
+        titles = (await db.scalars(
+            select(Todos.title).where(Todos.owner_id == owner_id)
+            .where(*_todo_conditions(dialect, None, None, None, prefix))
+            .group_by(title).order_by(title).limit(limit)
+        )).all()
+    todo_suggest_cache.set(owner_id, generation, (prefix, limit), titles)
+
+    return ORJSONResponse({"suggestions": titles})
+
+@router.get('/todos/stats', status_code=status.HTTP_200_OK)
+async def read_stats(db: read_db_dependency, user: user_dependency):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    return await todo_stats(db, user.get("user_id"))
+
+@router.get('/todo/{todo_id}', status_code=status.HTTP_200_OK, response_model=PartialTodoResponse)
+async def get_todo_by_id(db: read_db_dependency, user: user_dependency, columns: fields_dependency,
+                         todo_id: int = Path(gt=0), if_none_match: Annotated[str | None, Header()] = None):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    todo_model: Todos | None = db.query(Todos).filter(Todos.id == todo_id).filter(Todos.owner_id == user.get("user_id")).first()
+    todo = (await db.execute(
+        select(*columns).where(Todos.id == todo_id).where(Todos.owner_id == user.get("user_id"))
+    )).first()
 
-    if todo_model is None:
+    if todo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
 
-    return todo_model
+    # Checked once the todo is known to exist: "If-None-Match: *" must not turn
+    # a missing todo into a 304.
+    etag = todo_etag(user.get("user_id"), await todo_version(db, user.get("user_id")), columns)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-@router.post('/todo', status_code=status.HTTP_201_CREATED)
-async def create_todo(db: db_dependency, user: user_dependency, todo: TodoRequest):
+    # Returned as-is: a projection would not validate against the full model.
+    return ORJSONResponse(todo._asdict(), headers={"ETag": etag})
+
+@router.get('/todos/changes', status_code=status.HTTP_200_OK, response_model=TodoChanges)
+async def read_changes(db: read_db_dependency, user: user_dependency, since: str | None = None,
+                       limit: int = Query(default=DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE)):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    owner_id = user.get("user_id")
+    version, todo_id = decode_cursor(since, (int, int)) if since is not None else (0, 0)
+
+    # Rows and tombstones are both stamped with the owner's version at write
+    # time, so the change feed is two index range scans merged on (version, id).
+    todos = (await db.execute(
+        select(*TODO_COLUMNS).where(Todos.owner_id == owner_id)
+        .where(tuple_(Todos.version, Todos.id) > tuple_(version, todo_id))
+        .order_by(Todos.version, Todos.id).limit(limit + 1)
+    )).all()
+
+    # A first sync has nothing to delete, so it skips the tombstones.
+    tombstones = [] if since is None else (await db.execute(
+        select(TodoTombstones.version, TodoTombstones.todo_id).where(TodoTombstones.owner_id == owner_id)
+        .where(tuple_(TodoTombstones.version, TodoTombstones.todo_id) > tuple_(version, todo_id))
+        .order_by(TodoTombstones.version, TodoTombstones.todo_id).limit(limit + 1)
+    )).all()
+
+    changes = list(heapq.merge(
+        (((todo.version, todo.id), todo) for todo in todos),
+        (((tombstone.version, tombstone.todo_id), None) for tombstone in tombstones),
+        key=lambda change: change[0],
+    ))[:limit + 1]
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    return {
+        "updated": [todo for _, todo in changes if todo is not None],
+        "deleted": [key[1] for key, todo in changes if todo is None],
+        "next_cursor": encode_cursor(*(changes[-1][0] if changes else (version, todo_id))),
+        "has_more": has_more,
+    }
+
+@router.post('/todo', status_code=status.HTTP_201_CREATED, response_model=TodoResponse)
+async def create_todo(db: db_dependency, user: user_dependency, todo: TodoRequest,
+                      batcher: Annotated[TodoWriteBatcher | None, Depends(get_todo_write_batcher)]):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    todo_model = Todos(**todo.model_dump(), owner_id=user.get("user_id"))
+    # Group commit: the background writer inserts this todo together with
+    # other concurrent creates; the session above is never used, so it never
+    # checks out a connection.
+    if batcher is not None:
+        return await batcher.create(user.get("user_id"), todo.model_dump())
+
+    # The flush fetches the new id with INSERT ... RETURNING and every other
+    # column is already known, so no refresh is needed after the commit.
+    version = await bump_todo_version(db, user.get("user_id"))
+    todo_model = Todos(**todo.model_dump(), owner_id=user.get("user_id"), version=version)
     db.add(todo_model)
-    db.commit()
-    db.refresh(todo_model)
+    await db.commit()
+    invalidate_todos(user.get("user_id"))
     return todo_model
 
 @router.put('/todo/{todo_id}', status_code=status.HTTP_204_NO_CONTENT)
@@ -75,28 +323,219 @@ async def update_todo(db: db_dependency, user: user_dependency, todo: TodoReques
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    todo_model: Todos | None = db.query(Todos).filter(Todos.id == todo_id).filter(Todos.owner_id == user.get("user_id")).first()
+    version = await bump_todo_version(db, user.get("user_id"))
+    updated = await execute_returning(
+        db,
+        update(Todos).where(Todos.id == todo_id).where(Todos.owner_id == user.get("user_id"))
+        .values(**todo.model_dump(), version=version),
+        Todos.id,
+    )
 
-    if todo_model is None:
+    if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
 
-    todo_model.title = todo.title
-    todo_model.description = todo.description
-    todo_model.priority = todo.priority
-    todo_model.complete = todo.complete
-    db.add(todo_model)
-    db.commit()
+    await db.commit()
+    invalidate_todos(user.get("user_id"))
 
 @router.delete('/todo/{todo_id}', status_code=status.HTTP_204_NO_CONTENT)
 async def delete_todo(db: db_dependency, user: user_dependency, todo_id: int = Path(gt=0)):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    todo_model: Todos | None = db.query(Todos).filter(Todos.id == todo_id).filter(Todos.owner_id == user.get("user_id")).first()
+    deleted = await execute_returning(
+        db,
+        delete(Todos).where(Todos.id == todo_id).where(Todos.owner_id == user.get("user_id")),
+        Todos.id,
+    )
 
-    if todo_model is None:
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
 
-    db.query(Todos).filter(Todos.id == todo_id).filter(Todos.owner_id == user.get("user_id")).delete(synchronize_session=False)
+    await record_deletions(db, user.get("user_id"), [todo_id])
+    await db.commit()
+    invalidate_todos(user.get("user_id"))
+
+@router.post('/todos/bulk', status_code=status.HTTP_201_CREATED)
+async def create_todos_bulk(db: db_dependency, user: user_dependency,
+                            todos: Annotated[list[TodoRequest], Body(min_length=1, max_length=BULK_MAX_ITEMS)]):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    # One multi-row INSERT ... RETURNING; ids come back in request order.
+    version = await bump_todo_version(db, user.get("user_id"))
+    rows = [{**todo.model_dump(), "owner_id": user.get("user_id"), "version": version} for todo in todos]
+    ids = (await db.scalars(insert(Todos).returning(Todos.id, sort_by_parameter_order=True), rows)).all()
+    await db.commit()
+    invalidate_todos(user.get("user_id"))
+
+    return {"results": [{"id": todo_id, "status": "created"} for todo_id in ids]}
+
+@router.patch('/todos/bulk', status_code=status.HTTP_200_OK)
+async def update_todos_bulk(db: db_dependency, user: user_dependency,
+                            todos: Annotated[list[TodoBulkUpdateRequest], Body(min_length=1, max_length=BULK_MAX_ITEMS)]):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    requested_ids = {todo.id for todo in todos}
+    owned_ids = set(await db.scalars(
+        select(Todos.id).where(Todos.owner_id == user.get("user_id")).where(Todos.id.in_(requested_ids))
+    ))
+
+    if owned_ids:
+        version = await bump_todo_version(db, user.get("user_id"))
+        rows = [{**todo.model_dump(exclude={"id"}), "version": version, "todo_id": todo.id}
+                for todo in todos if todo.id in owned_ids]
+        table = Todos.__table__
+        await db.execute(
+            update(table).where(table.c.id == bindparam("todo_id")).where(table.c.owner_id == user.get("user_id")),
+            rows,
+        )
+    await db.commit()
+    invalidate_todos(user.get("user_id"))
+
+    return {"results": [
+        {"id": todo.id, "status": "updated" if todo.id in owned_ids else "not_found"} for todo in todos
+    ]}
+
+@router.delete('/todos/bulk', status_code=status.HTTP_200_OK)
+async def delete_todos_bulk(db: db_dependency, user: user_dependency, request: TodoBulkDeleteRequest):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    deleted = await execute_returning(
+        db,
+        delete(Todos).where(Todos.owner_id == user.get("user_id")).where(Todos.id.in_(set(request.ids))),
+        Todos.id,
+    )
+    deleted_ids = {row.id for row in deleted}
+    if deleted_ids:
+        await record_deletions(db, user.get("user_id"), deleted_ids)
+    await db.commit()
+    invalidate_todos(user.get("user_id"))
+
+    return {"results": [
+        {"id": todo_id, "status": "deleted" if todo_id in deleted_ids else "not_found"} for todo_id in request.ids
+    ]}
+
+@router.get('/todos/export', status_code=status.HTTP_200_OK)
+async def export_todos(request: Request, session_factory: session_factory_dependency, user: user_dependency,
+                       export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format")):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    query = select(*TODO_EXPORT_COLUMNS).where(Todos.owner_id == user.get("user_id")).order_by(Todos.priority, Todos.id)
+
+    return stream_rows(request, session_factory, query, export_format, "todos")
+
+async def _upload_records(chunks, import_format: str):
+    """Yield (line number, raw record) pairs from the request body as it arrives."""
+    # Spreadsheet tools often prefix CSV exports with a byte order mark.
+    decoder = codecs.getincrementaldecoder("utf-8-sig" if import_format == "csv" else "utf-8")()
+    pending = ""
+    record = ""
+    line_number = 0
+    record_line = 0
+
+    async for chunk in chunks:
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Body is not valid UTF-8 after line {line_number}")
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            if not record:
+                record_line = line_number
+            record += line + "\n"
+            # A CSV record ends once its quotes are balanced; a quoted field may
+            # span several lines. NDJSON records are always a single line.
+            if import_format == "ndjson" or record.count('"') % 2 == 0:
+                yield record_line, record
+                record = ""
+
+    try:
+        tail = pending + decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Body is not valid UTF-8 after line {line_number}")
+    if record or tail.strip():
+        yield record_line if record else line_number + 1, record + tail
 
-    db.commit()
+async def _insert_import_batch(db: AsyncSession, rows: list[dict]):
+    if db.get_bind().dialect.driver == "asyncpg":
+        # COPY is the fastest bulk path Postgres offers; it runs on the session's
+        # connection, inside the same transaction as the rest of the import.
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Todos.__tablename__,
+            records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+            columns=IMPORT_COLUMNS,
+        )
+    else:
+        await db.execute(insert(Todos), rows)
+
+@router.post('/todos/import', status_code=status.HTTP_200_OK)
+async def import_todos(request: Request, db: db_dependency, user: user_dependency,
+                       import_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format")):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    # The version is bumped with the first valid batch: an import in which
+    # every record fails must not change the owner's ETags or delta cursor.
+    version = None
+    imported = 0
+    failed = 0
+    errors = []
+    batch = []
+    header = None
+
+    async for line_number, record in _upload_records(request.stream(), import_format):
+        if not record.strip():
+            continue
+
+        try:
+            if import_format == "csv":
+                values = next(csv.reader(io.StringIO(record)))
+                if header is None:
+                    header = values
+                    continue
+                data = dict(zip(header, values))
+            else:
+                data = json.loads(record)
+            todo = TodoRequest.model_validate(data)
+        except (ValueError, csv.Error, ValidationError) as e:
+            failed += 1
+            if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                details = [error["msg"] for error in e.errors()] if isinstance(e, ValidationError) else [str(e)]
+                errors.append({"line": line_number, "errors": details})
+            continue
+
+        batch.append({**todo.model_dump(), "owner_id": user.get("user_id"), "updated_at": now})
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            if version is None:
+                version = await bump_todo_version(db, user.get("user_id"))
+            await _insert_import_batch(db, [{**row, "version": version} for row in batch])
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        if version is None:
+            version = await bump_todo_version(db, user.get("user_id"))
+        await _insert_import_batch(db, [{**row, "version": version} for row in batch])
+        imported += len(batch)
+    if imported:
+        await db.commit()
+        invalidate_todos(user.get("user_id"))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(imported / elapsed) if elapsed else imported,
+    }
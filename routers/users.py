@@ -1,29 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends, Path, status
 from pydantic import BaseModel, Field
-from database import SessionLocal
+from database import get_db, session_router
 from models import Todos, Users
 from typing import Annotated
-from sqlalchemy.orm import Session
-from .auth import get_current_user
-from passlib.context import CryptContext
-
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import ORJSONResponse
+from schemas import PartialUserResponse, user_fields
+from .auth import get_current_user, get_read_db
+from passwords import hash_password, verify_password
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
 )
   
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
+fields_dependency = Annotated[tuple, Depends(user_fields)]
 
 class UserVerification(BaseModel):
     current_password: str      
@@ -51,48 +46,51 @@ class PhoneVerification(BaseModel):
         }
     }
 
-@router.get('/', status_code=status.HTTP_200_OK)
-def read_all(db: db_dependency, user: user_dependency):
+@router.get('/', status_code=status.HTTP_200_OK, response_model=PartialUserResponse)
+async def read_all(db: read_db_dependency, user: user_dependency, columns: fields_dependency):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    return db.query(Users).filter(Users.id == user.get("user_id")).first()
+    user_row = (await db.execute(select(*columns).where(Users.id == user.get("user_id")))).first()
+    return ORJSONResponse(user_row._asdict() if user_row is not None else None)
 
 @router.put('/password', status_code=status.HTTP_204_NO_CONTENT)
-def change_password(db: db_dependency, user: user_dependency, user_verification: UserVerification):
+async def change_password(db: db_dependency, user: user_dependency, user_verification: UserVerification):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    user_model: Users | None = db.query(Users).filter(Users.id == user.get("user_id")).first()
+    user_model: Users | None = await db.scalar(select(Users).where(Users.id == user.get("user_id")))
 
     if user_model is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    if not bcrypt_context.verify(user_verification.current_password, user_model.hashed_password):
+    if not await verify_password(user_verification.current_password, user_model.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
     
-    user_model.hashed_password = bcrypt_context.hash(user_verification.new_password)
+    user_model.hashed_password = await hash_password(user_verification.new_password)
 
     db.add(user_model)
-    db.commit()
+    await db.commit()
+    session_router.record_write(user.get("user_id"))
 
 @router.put('/phone', status_code=status.HTTP_204_NO_CONTENT)
-def change_phone_number(db: db_dependency, user: user_dependency, user_verification: PhoneVerification):
+async def change_phone_number(db: db_dependency, user: user_dependency, user_verification: PhoneVerification):
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     
-    user_model: Users | None = db.query(Users).filter(Users.id == user.get("user_id")).first()
+    user_model: Users | None = await db.scalar(select(Users).where(Users.id == user.get("user_id")))
 
     if user_model is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    if not bcrypt_context.verify(user_verification.current_password, user_model.hashed_password):
+    if not await verify_password(user_verification.current_password, user_model.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
     
     user_model.phone_number = user_verification.new_phone_number
 
     db.add(user_model)
-    db.commit()
+    await db.commit()
+    session_router.record_write(user.get("user_id"))
 
 
 
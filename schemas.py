@@ -0,0 +1,103 @@
+from datetime import datetime
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, create_model
+from models import Todos, Users
+
+# The response models describe every todo and user payload: they validate the
+# ORM objects returned by write endpoints and define the columns read endpoints
+# select. Read endpoints send those rows straight to orjson rather than
+# validating them through the models, and since ?fields= may leave any field
+# out, they publish the Partial* variants below, in which no field is required.
+
+
+class TodoResponse(BaseModel):
+    id: int
+    title: str
+    description: str | None
+    priority: int
+    complete: bool | None
+    owner_id: int | None
+    version: int
+    updated_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+class TodoChanges(BaseModel):
+    updated: list[TodoResponse]
+    deleted: list[int]
+    next_cursor: str
+    has_more: bool
+
+class UserResponse(BaseModel):
+    id: int
+    email: str | None
+    username: str | None
+    first_name: str | None
+    last_name: str | None
+    is_active: bool | None
+    role: str | None
+    phone_number: str | None
+
+    model_config = {"from_attributes": True}
+
+
+def _partial(model: type[BaseModel]) -> type[BaseModel]:
+    """``model`` with every field optional: the schema of a ``?fields=`` projection."""
+    fields = {name: (field.annotation | None, None) for name, field in model.model_fields.items()}
+    return create_model(f"Partial{model.__name__}", **fields)
+
+PartialTodoResponse = _partial(TodoResponse)
+PartialUserResponse = _partial(UserResponse)
+
+class PartialTodoPage(BaseModel):
+    items: list[PartialTodoResponse]
+    next_cursor: str | None
+
+
+# Columns selected by the read-only endpoints, one per response field. Plain
+# column selects come back as lightweight rows that skip the session's
+# identity map, unit-of-work state and attribute instrumentation.
+# The response fields double as the ?fields= allow-lists, which keeps columns
+# such as Users.hashed_password out of every projection.
+TODO_FIELDS = {name: getattr(Todos, name) for name in TodoResponse.model_fields}
+USER_FIELDS = {name: getattr(Users, name) for name in UserResponse.model_fields}
+TODO_COLUMNS = tuple(TODO_FIELDS.values())
+USER_COLUMNS = tuple(USER_FIELDS.values())
+# Columns of an NDJSON/CSV export, shared by the user and admin exports and
+# matching what POST /todos/import reads back.
+TODO_EXPORT_COLUMNS = (Todos.id, Todos.title, Todos.description, Todos.priority, Todos.complete, Todos.owner_id)
+
+
+def parse_fields(fields: str | None, allowed: dict) -> tuple:
+    """Columns for a comma separated ``fields`` projection, in response order."""
+    if fields is None:
+        return tuple(allowed.values())
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - allowed.keys()
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid fields; allowed: {', '.join(allowed)}",
+        )
+    return tuple(column for name, column in allowed.items() if name in requested)
+
+
+def todo_fields(fields: str | None = Query(default=None, description="Comma separated todo fields to return")):
+    return parse_fields(fields, TODO_FIELDS)
+
+
+def user_fields(fields: str | None = Query(default=None, description="Comma separated user fields to return")):
+    return parse_fields(fields, USER_FIELDS)
+
+
+def with_keys(columns: tuple, *keys) -> tuple:
+    """``columns`` followed by any of ``keys`` a cursor needs but the projection left out."""
+    selected = {column.key for column in columns}
+    return (*columns, *(key for key in keys if key.key not in selected))
+
+
+def project(rows, columns: tuple) -> list[dict]:
+    """Row dicts holding only ``columns``, dropping key columns added by ``with_keys``."""
+    names = [column.key for column in columns]
+    return [dict(zip(names, row)) for row in rows]
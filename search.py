@@ -0,0 +1,38 @@
+import re
+from sqlalchemy import column, func, literal_column, select, table
+from models import TODO_SEARCH_VECTOR, Todos
+
+_todos_fts = table("todos_fts", column("rowid"))
+
+
+def _fts5_query(q: str, owner_id: int) -> str:
+    # Each word becomes a quoted FTS5 string, so user input can never be read
+    # as query syntax; adjacent strings are implicitly ANDed. The words only
+    # match title and description, and the owner_id column limits the match
+    # to one owner's todos.
+    terms = " ".join(f'"{term}"' for term in re.findall(r"\w+", q))
+    return f'{{title description}} : ({terms}) AND owner_id : "{int(owner_id)}"'
+
+
+def search_query(dialect: str, q: str, owner_id: int, columns: tuple):
+    """``select`` of ``columns`` plus a ``rank`` column for ``owner_id``'s todos matching ``q``.
+
+    Lower ranks are better on every backend, so callers order by (rank, id)
+    ascending and page with a keyset cursor over the same pair.
+    """
+    if dialect == "postgresql":
+        tsquery = func.plainto_tsquery(literal_column("'english'"), q)
+        vector = literal_column(TODO_SEARCH_VECTOR)
+        rank = (-func.ts_rank_cd(vector, tsquery)).label("rank")
+        query = select(*columns, rank).where(Todos.owner_id == owner_id, vector.op("@@")(tsquery))
+        return query, rank
+
+    # bm25() is only valid inside the FTS query itself, so matches are ranked
+    # in a subquery and joined back to todos on the primary key.
+    matches = (
+        select(_todos_fts.c.rowid.label("id"), func.bm25(literal_column("todos_fts"), 1.0, 1.0, 0.0).label("rank"))
+        .where(literal_column("todos_fts").op("MATCH")(_fts5_query(q, owner_id)))
+        .subquery()
+    )
+    query = select(*columns, matches.c.rank).join_from(Todos, matches, Todos.id == matches.c.id)
+    return query.where(Todos.owner_id == owner_id), matches.c.rank
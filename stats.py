@@ -0,0 +1,48 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from models import TodoCounts, Todos
+
+load_dotenv()
+
+# Read statistics from the trigger-maintained todo_counts rows instead of
+# grouping the todos themselves. The counters are always kept up to date, so
+# this can be switched on at any time.
+TODO_STATS_FROM_COUNTERS = os.getenv("TODO_STATS_FROM_COUNTERS", "false").lower() == "true"
+
+
+async def todo_stats(db, owner_id: int | None = None) -> dict:
+    """Todo counts by completion and priority, for one owner or for everyone."""
+    if TODO_STATS_FROM_COUNTERS:
+        count = func.sum(TodoCounts.count)
+        query = select(TodoCounts.complete, TodoCounts.priority, count).where(TodoCounts.count > 0)
+        if owner_id is not None:
+            query = query.where(TodoCounts.owner_id == owner_id)
+        group_by = (TodoCounts.complete, TodoCounts.priority)
+    else:
+        # For one owner this reads only ix_todos_owner_id_complete_priority_id.
+        query = select(Todos.complete, Todos.priority, func.count())
+        if owner_id is not None:
+            query = query.where(Todos.owner_id == owner_id)
+        group_by = (Todos.complete, Todos.priority)
+
+    groups = {}
+    for complete, priority, count in await db.execute(query.group_by(*group_by)):
+        key = (bool(complete), priority or 0)
+        groups[key] = groups.get(key, 0) + count
+
+    by_complete = {"true": 0, "false": 0}
+    by_priority = {}
+    for (complete, priority), count in groups.items():
+        by_complete["true" if complete else "false"] += count
+        by_priority[str(priority)] = by_priority.get(str(priority), 0) + count
+
+    return {
+        "total": sum(groups.values()),
+        "by_complete": by_complete,
+        "by_priority": dict(sorted(by_priority.items(), key=lambda item: int(item[0]))),
+        "groups": [
+            {"complete": complete, "priority": priority, "count": count}
+            for (complete, priority), count in sorted(groups.items())
+        ],
+    }
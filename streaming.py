@@ -0,0 +1,76 @@
+import csv
+import io
+import os
+import zlib
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+EXPORT_BATCH_SIZE = int(os.getenv("TODO_EXPORT_BATCH_SIZE", "1000"))
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _row_chunks(session_factory, query, export_format: str):
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(query.selected_columns.keys())
+        yield buffer.getvalue().encode()
+
+    # The request's own session is closed before the body is sent, so the
+    # stream opens a session of its own and holds it until the last row.
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+async def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip: listed (or ``*``) with q > 0.
+
+    An explicit gzip entry wins over ``*``, so ``*, gzip;q=0`` refuses gzip.
+    """
+    qualities = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in entry.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def stream_rows(request: Request, session_factory, query, export_format: str, filename: str) -> StreamingResponse:
+    """Stream the rows of a Core ``select`` as NDJSON or CSV with flat memory use,
+    gzip-compressing on the fly when the client accepts it."""
+    chunks = _row_chunks(session_factory, query, export_format)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{export_format}"', "Vary": "Accept-Encoding"}
+
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = _gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers)
@@ -0,0 +1,83 @@
+import json
+from .utils import *
+
+
+@pytest.fixture()
+def admin_user():
+    original_override = app.dependency_overrides[get_current_user]
+    app.dependency_overrides[get_current_user] = lambda: {"username": "admin", "user_id": 1, "role": "admin"}
+    yield
+    app.dependency_overrides[get_current_user] = original_override
+
+
+@pytest.fixture()
+def many_todos(test_todo):
+    db = Testing_session_local()
+    db.add_all([
+        Todos(title=f"todo {i}", description="test", priority=1 + i % 5, complete=i % 2 == 0, owner_id=1 + i % 3)
+        for i in range(10)
+    ])
+    db.commit()
+    db.close()
+
+
+def test_admin_read_all_authenticated(admin_user, test_todo):
+    response = client.get("/admin/todos")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"items": [{"id": test_todo.id, "title": test_todo.title, "description": test_todo.description, "priority": test_todo.priority, "complete": test_todo.complete, "owner_id": test_todo.owner_id, "version": test_todo.version, "updated_at": test_todo.updated_at.isoformat()}], "next_cursor": None}
+
+
+def test_admin_read_all_requires_admin(test_todo):
+    response = client.get("/admin/todos")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {"detail": "User not authorized"}
+
+
+def test_admin_read_all_paginates_with_filters(admin_user, many_todos):
+    params = {"owner_id": 2, "complete": True, "priority_min": 2, "limit": 1}
+    db = Testing_session_local()
+    expected = [todo.id for todo in db.query(Todos).filter(
+        Todos.owner_id == 2, Todos.complete == True, Todos.priority >= 2).order_by(Todos.id)]
+    db.close()
+
+    seen = []
+    while True:
+        page = client.get("/admin/todos", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert expected and seen == expected
+
+
+def test_admin_export_ndjson(admin_user, many_todos):
+    response = client.get("/admin/todos/export", params={"priority_max": 2})
+    assert response.status_code == status.HTTP_200_OK
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows and all(row["priority"] <= 2 for row in rows)
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+
+def test_admin_delete_todo(admin_user, test_todo):
+    response = client.delete(f"/admin/todos/{test_todo.id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert client.delete(f"/admin/todos/{test_todo.id}").status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_admin_read_all_sparse_fields(admin_user, many_todos):
+    page = client.get("/admin/todos", params={"fields": "owner_id", "limit": 2}).json()
+    assert all(item.keys() == {"owner_id"} for item in page["items"])
+    assert page["next_cursor"] is not None
+
+
+@pytest.mark.parametrize("from_counters", [False, True])
+def test_admin_stats(admin_user, many_todos, monkeypatch, from_counters):
+    monkeypatch.setattr("stats.TODO_STATS_FROM_COUNTERS", from_counters)
+    db = Testing_session_local()
+    total = db.query(Todos).count()
+    owner_total = db.query(Todos).filter(Todos.owner_id == 2).count()
+    db.close()
+
+    assert client.get("/admin/todos/stats").json()["total"] == total
+    assert client.get("/admin/todos/stats", params={"owner_id": 2}).json()["total"] == owner_total
@@ -0,0 +1,29 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException, status
+from routers.auth import create_access_token, get_current_user, token_cache
+
+
+def test_get_current_user_caches_verified_claims():
+    token_cache.clear()
+    token = create_access_token("testuser", 1, "user", timedelta(minutes=20))
+    hits, misses = token_cache.hits, token_cache.misses
+
+    first = asyncio.run(get_current_user(token))
+    second = asyncio.run(get_current_user(token))
+
+    assert first == second == {"username": "testuser", "user_id": 1, "role": "user"}
+    assert token_cache.misses == misses + 1
+    assert token_cache.hits == hits + 1
+
+
+def test_get_current_user_rejects_expired_token():
+    token_cache.clear()
+    token = create_access_token("testuser", 1, "user", timedelta(minutes=-1))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_current_user(token))
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert token_cache.stats()["size"] == 0
@@ -0,0 +1,119 @@
+import asyncio
+from batching import TodoWriteBatcher, todo_write_batcher
+from versioning import bump_todo_version
+from .utils import *
+
+TODO = {"title": "batched", "description": "test", "priority": 1, "complete": False}
+
+
+@pytest.fixture()
+def clean_todos():
+    yield
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM todos"))
+        connection.commit()
+
+
+def test_concurrent_creates_share_one_transaction(test_user, clean_todos):
+    batcher = TodoWriteBatcher(Testing_async_session_local, max_size=50, max_delay=0.05)
+
+    async def create_many():
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.create(1, {**TODO, "title": f"batched {i}"}) for i in range(20)))
+        finally:
+            await batcher.stop()
+
+    rows = asyncio.run(create_many())
+
+    assert [row["title"] for row in rows] == [f"batched {i}" for i in range(20)]
+    assert len({row["id"] for row in rows}) == 20
+    assert len({row["version"] for row in rows}) == 1
+    assert batcher.stats() == {"running": False, "batches": 1, "rows": 20, "max_batch": 20, "pending": 0}
+
+    db = Testing_session_local()
+    assert db.query(Todos).filter(Todos.owner_id == 1).count() == 20
+    db.close()
+
+
+def test_owner_versions_are_bumped_in_id_order(test_user, clean_todos, monkeypatch):
+    bumped = []
+
+    async def record_bump(db, owner_id):
+        bumped.append(owner_id)
+        return await bump_todo_version(db, owner_id)
+
+    monkeypatch.setattr("batching.bump_todo_version", record_bump)
+    batcher = TodoWriteBatcher(Testing_async_session_local, max_size=50, max_delay=0.05)
+
+    async def create_for_two_owners():
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.create(owner_id, TODO) for owner_id in (2, 1, 2, 1)))
+        finally:
+            await batcher.stop()
+
+    rows = asyncio.run(create_for_two_owners())
+
+    assert bumped == [1, 2]
+    assert [row["owner_id"] for row in rows] == [2, 1, 2, 1]
+    assert batcher.stats()["batches"] == 1
+
+
+def test_failed_row_does_not_fail_its_batch(test_user, test_todo):
+    batcher = TodoWriteBatcher(Testing_async_session_local, max_size=50, max_delay=0.05)
+
+    async def create_with_bad_row():
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.create(1, TODO),
+                batcher.create(1, {**TODO, "id": test_todo.id}),
+                batcher.create(1, TODO),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    good, bad, also_good = asyncio.run(create_with_bad_row())
+
+    assert isinstance(bad, Exception)
+    assert good["id"] != also_good["id"]
+
+
+def test_create_todo_through_batcher(test_user, clean_todos, monkeypatch):
+    monkeypatch.setattr("batching.TODO_WRITE_BATCHING", True)
+    monkeypatch.setattr(todo_write_batcher, "session_factory", Testing_async_session_local)
+
+    with TestClient(app) as batching_client:
+        response = batching_client.post("/todo", json=TODO)
+        assert response.status_code == status.HTTP_201_CREATED
+        created = response.json()
+        assert {key: created[key] for key in TODO} == TODO
+        assert created["owner_id"] == 1
+
+        assert [todo["id"] for todo in batching_client.get("/").json()] == [created["id"]]
+        assert todo_write_batcher.stats()["rows"] >= 1
+
+    assert not todo_write_batcher.running
+
+
+def test_stop_writes_the_batch_in_flight(test_user, clean_todos):
+    batcher = TodoWriteBatcher(Testing_async_session_local, max_size=50, max_delay=0.2)
+
+    async def stop_while_collecting():
+        await batcher.start()
+        creates = [asyncio.create_task(batcher.create(1, {**TODO, "title": f"batched {i}"})) for i in range(5)]
+        # Let _run pick the creates up and start waiting for more.
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        return await asyncio.gather(*creates)
+
+    rows = asyncio.run(stop_while_collecting())
+
+    assert [row["title"] for row in rows] == [f"batched {i}" for i in range(5)]
+    assert batcher.stats()["rows"] == 5
+
+    db = Testing_session_local()
+    assert db.query(Todos).filter(Todos.owner_id == 1).count() == 5
+    db.close()
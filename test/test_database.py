@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from database import PoolMetrics, SessionMetrics, apply_sqlite_pragmas
+from sqlalchemy.pool import QueuePool
+
+
+def test_pool_metrics_count_checkouts_overflow_and_timeouts(tmp_path):
+    metrics = PoolMetrics()
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=metrics.pool_class(QueuePool),
+                           pool_size=1, max_overflow=1, pool_timeout=0.05)
+    metrics.attach(engine)
+
+    first = engine.connect()
+    second = engine.connect()
+    second.execute(text("SELECT 1"))
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = metrics.stats()
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["peak_overflow"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["acquires"] == 3
+    assert stats["acquire_seconds_max"] >= 0.05
+    assert stats["acquire_seconds_avg"] == pytest.approx(stats["acquire_seconds_total"] / 3, abs=1e-6)
+
+    first.close()
+    second.close()
+    engine.dispose()
+    assert metrics.stats()["checked_out"] == 0
+    assert metrics.stats()["checkouts"] == 2
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine, {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -2048, "temp_store": "MEMORY"})
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -2048
+        assert connection.exec_driver_sql("PRAGMA temp_store").scalar() == 2
+    engine.dispose()
+
+
+def test_sqlite_pragmas_applied_on_async_connect(tmp_path):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(async_engine.sync_engine, {"journal_mode": "WAL", "busy_timeout": 1234})
+
+    async def read_pragmas():
+        async with async_engine.connect() as connection:
+            journal_mode = (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            busy_timeout = (await connection.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+        await async_engine.dispose()
+        return journal_mode, busy_timeout
+
+    assert asyncio.run(read_pragmas()) == ("wal", 1234)
+
+
+def test_sessions_connect_lazily_and_count_connections(tmp_path):
+    pool_metrics = PoolMetrics()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lazy.db'}",
+                                       poolclass=pool_metrics.pool_class(NullPool))
+    pool_metrics.attach(async_engine.sync_engine)
+    session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    metrics = SessionMetrics()
+
+    async def requests():
+        async with metrics.scope(session_factory):
+            pass
+        assert pool_metrics.stats()["checkouts"] == 0
+
+        async with metrics.scope(session_factory) as db:
+            await db.execute(text("SELECT 1"))
+            await db.commit()
+            await db.execute(text("SELECT 1"))
+        await async_engine.dispose()
+
+    asyncio.run(requests())
+    assert metrics.stats() == {"sessions": 2, "sessions_connected": 1, "connections": 2, "max_connections_per_session": 2}
+    assert pool_metrics.stats()["checkouts"] == 2
@@ -1,11 +1,59 @@
 from fastapi.testclient import TestClient
 from main import app
 from fastapi import status
+from routers.auth import get_current_user
+import pytest
 
 client = TestClient(app)
 
+@pytest.fixture()
+def as_role():
+    original_override = app.dependency_overrides.get(get_current_user)
+
+    def set_role(role):
+        app.dependency_overrides[get_current_user] = lambda: {"username": role, "user_id": 1, "role": role}
+
+    yield set_role
+    if original_override is None:
+        app.dependency_overrides.pop(get_current_user, None)
+    else:
+        app.dependency_overrides[get_current_user] = original_override
+
 def test_return_health_check():
     response = client.get("/healthy")
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {"status": "healthy"}
 
+def test_metrics_requires_admin(as_role):
+    as_role("user")
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {"detail": "User not authorized"}
+
+def test_metrics_requires_authentication():
+    original_override = app.dependency_overrides.pop(get_current_user, None)
+    try:
+        assert client.get("/metrics").status_code == status.HTTP_401_UNAUTHORIZED
+    finally:
+        if original_override is not None:
+            app.dependency_overrides[get_current_user] = original_override
+
+def test_metrics_exposes_token_cache_counters(as_role):
+    as_role("admin")
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()["token_cache"]) == {"size", "maxsize", "hits", "misses"}
+
+def test_metrics_exposes_db_counters(as_role):
+    as_role("admin")
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert {"checked_out", "overflow", "checkouts", "timeouts", "acquires", "acquire_seconds_max"} <= set(response.json()["db_pool"])
+    assert set(response.json()["db_sessions"]) == {"sessions", "sessions_connected", "connections", "max_connections_per_session"}
+
+def test_projected_responses_publish_optional_fields():
+    schemas = app.openapi()["components"]["schemas"]
+    for name in ("PartialTodoResponse", "PartialUserResponse"):
+        assert "required" not in schemas[name]
+    todo_schema = app.openapi()["paths"]["/todo/{todo_id}"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert todo_schema["schema"] == {"$ref": "#/components/schemas/PartialTodoResponse"}
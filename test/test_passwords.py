@@ -0,0 +1,23 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException, status
+import passwords
+
+
+def test_hash_and_verify_password():
+    hashed = asyncio.run(passwords.hash_password("testpassword"))
+    assert hashed != "testpassword"
+    assert asyncio.run(passwords.verify_password("testpassword", hashed)) is True
+    assert asyncio.run(passwords.verify_password("wrongpassword", hashed)) is False
+
+
+def test_hash_password_fails_fast_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(passwords, "_slots", threading.BoundedSemaphore(1))
+    passwords._slots.acquire()
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(passwords.hash_password("testpassword"))
+
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.headers == {"Retry-After": "1"}
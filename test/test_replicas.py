@@ -0,0 +1,64 @@
+from database import SessionRouter
+from .utils import *
+
+
+@pytest.fixture()
+def replica(tmp_path, monkeypatch):
+    """Route reads through a real SessionRouter whose replica is a second SQLite file."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    replica_engine = create_engine(url)
+    Base.metadata.create_all(bind=replica_engine)
+    replica_async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+
+    router = SessionRouter(Testing_async_session_local,
+                           async_sessionmaker(bind=replica_async_engine, autoflush=False, expire_on_commit=False),
+                           stickiness=60)
+    monkeypatch.setattr("database.session_router", router)
+    monkeypatch.setattr("cache.session_router", router)
+    original_override = app.dependency_overrides.pop(get_read_db)
+    app.dependency_overrides[get_session_router] = lambda: router
+    yield sessionmaker(bind=replica_engine)
+    app.dependency_overrides[get_read_db] = original_override
+    del app.dependency_overrides[get_session_router]
+    replica_engine.dispose()
+
+
+def test_reads_go_to_replica_until_user_writes(test_user, test_todo, replica):
+    db = replica()
+    db.add(Todos(title="replica copy", description="test", priority=1, complete=False, owner_id=1))
+    db.commit()
+    db.close()
+
+    assert [todo["title"] for todo in client.get("/").json()] == ["replica copy"]
+
+    todo = {"title": "written", "description": "test", "priority": 1, "complete": False}
+    client.post("/todo", json=todo)
+
+    # The writer now reads from the primary and sees its own write.
+    assert [todo["title"] for todo in client.get("/").json()] == [test_todo.title, "written"]
+
+
+def test_other_users_keep_reading_the_replica(test_user, test_todo, replica):
+    client.post("/todo", json={"title": "written", "description": "test", "priority": 1, "complete": False})
+
+    original_override = app.dependency_overrides[get_current_user]
+    app.dependency_overrides[get_current_user] = lambda: {"username": "other", "user_id": 2, "role": "user"}
+    try:
+        db = replica()
+        db.add(Todos(title="replica copy", description="test", priority=1, complete=False, owner_id=2))
+        db.commit()
+        db.close()
+        assert [todo["title"] for todo in client.get("/").json()] == ["replica copy"]
+    finally:
+        app.dependency_overrides[get_current_user] = original_override
+
+
+def test_sticky_window_expires():
+    router = SessionRouter("primary", "replica", stickiness=0)
+    router.record_write(1)
+    assert router.for_read(1) == "replica"
+
+    router = SessionRouter("primary", "replica", stickiness=60)
+    router.record_write(1)
+    assert router.for_read(1) == "primary"
+    assert router.for_read(2) == "replica"
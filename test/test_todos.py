@@ -1,59 +1,16 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from database import Base
-from sqlalchemy.pool import StaticPool
-from main import app
-from routers.todos import get_db, get_current_user
-from fastapi.testclient import TestClient
-from fastapi import status, HTTPException
-import pytest
-from models import Todos
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
-
-Testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base.metadata.create_all(bind=engine)
-
-def override_get_db():
-    db = Testing_session_local()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def override_get_current_user():
-    return {"user_name": "test", "user_id": 1, "role": "user"}
-
-app.dependency_overrides[get_db] = override_get_db
-app.dependency_overrides[get_current_user] = override_get_current_user
-
-client = TestClient(app)
-
-@pytest.fixture()
-def test_todo():
-    todo = Todos(title="test", description="test", priority=1, complete=False, owner_id=1)
-    
-    db = Testing_session_local()
-    db.add(todo)
-    db.commit()
-    db.refresh(todo)
-    yield todo
-    with engine.connect() as connection:
-        connection.execute(text("DELETE FROM todos"))
-        connection.commit()
+import json
+from .utils import *
+from routers.todos import SORT_KEYS
 
 def test_read_all_authenticated(test_todo):
     response = client.get("/")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == [{"id": test_todo.id, "title": test_todo.title, "description": test_todo.description, "priority": test_todo.priority, "complete": test_todo.complete, "owner_id": test_todo.owner_id}]
+    assert response.json() == [{"id": test_todo.id, "title": test_todo.title, "description": test_todo.description, "priority": test_todo.priority, "complete": test_todo.complete, "owner_id": test_todo.owner_id, "version": test_todo.version, "updated_at": test_todo.updated_at.isoformat()}]
 
 def test_read_one_authenticated(test_todo):
     response = client.get(f"/todo/{test_todo.id}")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == {"id": test_todo.id, "title": test_todo.title, "description": test_todo.description, "priority": test_todo.priority, "complete": test_todo.complete, "owner_id": test_todo.owner_id}
+    assert response.json() == {"id": test_todo.id, "title": test_todo.title, "description": test_todo.description, "priority": test_todo.priority, "complete": test_todo.complete, "owner_id": test_todo.owner_id, "version": test_todo.version, "updated_at": test_todo.updated_at.isoformat()}
 
 def test_read_one_authenticated_not_found():
     response = client.get("/todo/999")
@@ -73,9 +30,439 @@ def test_read_one_unauthenticated(test_todo):
         assert response.json() == {"detail": "User not found"}
     finally:
         app.dependency_overrides[get_current_user] = original_override
-    
 
+def test_read_all_paginated(test_todo):
+    db = Testing_session_local()
+    db.add_all([
+        Todos(title="low", description="test", priority=3, complete=False, owner_id=1),
+        Todos(title="high", description="test", priority=1, complete=False, owner_id=1),
+        Todos(title="other", description="test", priority=1, complete=False, owner_id=2),
+    ])
+    db.commit()
+    expected = [todo.id for todo in db.query(Todos).filter(Todos.owner_id == 1).order_by(Todos.priority, Todos.id)]
+    db.close()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "after": cursor}
+        response = client.get("/", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+def test_read_all_invalid_cursor():
+    response = client.get("/", params={"after": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "Invalid cursor"}
+
+def test_create_todo(test_todo):
+    request_data = {"title": "new todo", "description": "new description", "priority": 5, "complete": False}
+    response = client.post("/todo", json=request_data)
+    assert response.status_code == status.HTTP_201_CREATED
+    created = response.json()
+    assert created.pop("updated_at")
+    assert created == {**request_data, "id": test_todo.id + 1, "owner_id": 1, "version": 0}
+
+def test_update_todo(test_todo):
+    request_data = {"title": "changed title", "description": "changed", "priority": 4, "complete": True}
+    response = client.put(f"/todo/{test_todo.id}", json=request_data)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    db = Testing_session_local()
+    todo_model = db.query(Todos).filter(Todos.id == test_todo.id).first()
+    assert (todo_model.title, todo_model.priority, todo_model.complete) == ("changed title", 4, True)
+    db.close()
+
+def test_update_todo_not_found(test_todo):
+    request_data = {"title": "changed title", "description": "changed", "priority": 4, "complete": True}
+    response = client.put("/todo/999", json=request_data)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Todo not found"}
+
+def test_delete_todo(test_todo):
+    response = client.delete(f"/todo/{test_todo.id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    db = Testing_session_local()
+    assert db.query(Todos).filter(Todos.id == test_todo.id).first() is None
+    db.close()
+
+def test_delete_todo_not_found():
+    response = client.delete("/todo/999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Todo not found"}
+
+def test_bulk_create_update_delete(test_todo):
+    todos = [{"title": f"bulk {i}", "description": "bulk", "priority": 1 + i % 5, "complete": False} for i in range(3)]
+    response = client.post("/todos/bulk", json=todos)
+    assert response.status_code == status.HTTP_201_CREATED
+    created = [result["id"] for result in response.json()["results"]]
+    assert len(created) == 3
+
+    updates = [{**todos[0], "id": created[0], "complete": True}, {**todos[1], "id": 999}]
+    response = client.patch("/todos/bulk", json=updates)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"results": [{"id": created[0], "status": "updated"}, {"id": 999, "status": "not_found"}]}
+    assert client.get(f"/todo/{created[0]}").json()["complete"] is True
+
+    response = client.request("DELETE", "/todos/bulk", json={"ids": [created[1], 999]})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"results": [{"id": created[1], "status": "deleted"}, {"id": 999, "status": "not_found"}]}
+    assert client.get(f"/todo/{created[1]}").status_code == status.HTTP_404_NOT_FOUND
+
+def test_bulk_create_rejects_invalid_item():
+    todos = [{"title": "valid", "description": "valid", "priority": 1, "complete": False},
+             {"title": "x", "description": "invalid", "priority": 9, "complete": False}]
+    response = client.post("/todos/bulk", json=todos)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert client.get("/").json() == []
+
+def test_export_ndjson(test_todo):
+    response = client.get("/todos/export", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"id": test_todo.id, "title": test_todo.title, "description": test_todo.description,
+         "priority": test_todo.priority, "complete": test_todo.complete, "owner_id": test_todo.owner_id}
+    ]
 
+def test_export_csv_gzip(test_todo):
+    response = client.get("/todos/export", params={"format": "csv"}, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.splitlines() == [
+        "id,title,description,priority,complete,owner_id",
+        f"{test_todo.id},test,test,1,False,1",
+    ]
 
+@pytest.mark.parametrize("accept_encoding, compressed", [
+    ("gzip;q=0", False),
+    ("br, gzip; q=0.5", True),
+    ("*", True),
+    ("*, gzip;q=0", False),
+    ("identity", False),
+])
+def test_export_honours_gzip_quality(test_todo, accept_encoding, compressed):
+    response = client.get("/todos/export", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.headers.get("content-encoding") == "gzip") is compressed
+
+def test_import_ndjson_reports_row_errors():
+    body = "\n".join([
+        json.dumps({"title": "imported", "description": "from ndjson", "priority": 2, "complete": False}),
+        json.dumps({"title": "x", "description": "too short title", "priority": 2, "complete": False}),
+        "{not json",
+        json.dumps({"title": "imported 2", "description": "from ndjson", "priority": 3, "complete": True}),
+    ])
+    response = client.post("/todos/import", content=body)
+    assert response.status_code == status.HTTP_200_OK
+    summary = response.json()
+    assert (summary["imported"], summary["failed"]) == (2, 2)
+    assert [error["line"] for error in summary["errors"]] == [2, 3]
+    assert sorted(todo["title"] for todo in client.get("/").json()) == ["imported", "imported 2"]
+
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM todos"))
+        connection.commit()
 
-    
\ No newline at end of file
+def test_import_csv_round_trips_export(test_todo):
+    client.post("/todo", json={"title": "multi", "description": "line one\nline \"two\"", "priority": 5, "complete": True})
+    exported = client.get("/todos/export", params={"format": "csv"}).content
+
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM todos"))
+        connection.commit()
+
+    response = client.post("/todos/import", params={"format": "csv"}, content=exported)
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.json()["imported"], response.json()["failed"]) == (2, 0)
+    assert sorted((todo["title"], todo["description"], todo["complete"]) for todo in client.get("/").json()) == [
+        ("multi", "line one\nline \"two\"", True),
+        ("test", "test", False),
+    ]
+
+def test_import_without_valid_records_keeps_etag(test_user, test_todo):
+    etag = client.get("/").headers["etag"]
+    response = client.post("/todos/import", content="{not json\n")
+    assert (response.json()["imported"], response.json()["failed"]) == (0, 1)
+    assert client.post("/todos/import", content=b"").json()["imported"] == 0
+    assert client.get("/").headers["etag"] == etag
+
+def test_import_csv_with_byte_order_mark():
+    body = "\ufefftitle,description,priority,complete\nimported,from a spreadsheet,2,false\n".encode("utf-8")
+    response = client.post("/todos/import", params={"format": "csv"}, content=body)
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.json()["imported"], response.json()["failed"]) == (1, 0)
+
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM todos"))
+        connection.commit()
+
+def test_import_rejects_invalid_utf8():
+    body = json.dumps({"title": "imported", "description": "from ndjson", "priority": 2, "complete": False}).encode()
+    response = client.post("/todos/import", content=body + b"\n\xff\xfe\n")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/").json() == []
+
+def test_read_all_served_from_cache_until_write(test_todo):
+    assert len(client.get("/").json()) == 1
+
+    db = Testing_session_local()
+    db.add(Todos(title="direct", description="bypasses the router", priority=2, complete=False, owner_id=1))
+    db.commit()
+    db.close()
+    assert len(client.get("/").json()) == 1
+
+    client.post("/todo", json={"title": "routed", "description": "invalidates", "priority": 3, "complete": False})
+    assert len(client.get("/").json()) == 3
+
+def test_read_all_etag_not_modified_until_write(test_user, test_todo):
+    response = client.get("/")
+    etag = response.headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    client.put(f"/todo/{test_todo.id}", json={"title": "changed", "description": "changed", "priority": 2, "complete": True})
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+def test_read_one_etag_not_modified(test_user, test_todo):
+    etag = client.get(f"/todo/{test_todo.id}").headers["etag"]
+    response = client.get(f"/todo/{test_todo.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+def test_read_one_wildcard_etag_requires_the_todo(test_user, test_todo):
+    assert client.get(f"/todo/{test_todo.id}", headers={"If-None-Match": "*"}).status_code == status.HTTP_304_NOT_MODIFIED
+    assert client.get("/todo/9999", headers={"If-None-Match": "*"}).status_code == status.HTTP_404_NOT_FOUND
+
+def test_changes_returns_updates_and_deletions_since_cursor(test_user, test_todo):
+    first_sync = client.get("/todos/changes").json()
+    assert [todo["id"] for todo in first_sync["updated"]] == [test_todo.id]
+    assert first_sync["deleted"] == [] and first_sync["has_more"] is False
+
+    created = client.post("/todo", json={"title": "new", "description": "synced", "priority": 1, "complete": False}).json()
+    client.delete(f"/todo/{test_todo.id}")
+
+    delta = client.get("/todos/changes", params={"since": first_sync["next_cursor"]}).json()
+    assert [todo["id"] for todo in delta["updated"]] == [created["id"]]
+    assert delta["deleted"] == [test_todo.id]
+
+    unchanged = client.get("/todos/changes", params={"since": delta["next_cursor"]}).json()
+    assert unchanged == {"updated": [], "deleted": [], "next_cursor": delta["next_cursor"], "has_more": False}
+
+def test_changes_never_reuses_a_deleted_id(test_user, test_todo):
+    first_sync = client.get("/todos/changes").json()
+    client.delete(f"/todo/{test_todo.id}")
+    created = client.post("/todo", json={"title": "new", "description": "synced", "priority": 1, "complete": False}).json()
+    assert created["id"] != test_todo.id
+
+    delta = client.get("/todos/changes", params={"since": first_sync["next_cursor"]}).json()
+    assert [todo["id"] for todo in delta["updated"]] == [created["id"]]
+    assert delta["deleted"] == [test_todo.id]
+    client.delete(f"/todo/{created['id']}")
+
+def test_changes_paginates_within_one_version(test_user):
+    todos = [{"title": f"bulk {i}", "description": "bulk", "priority": 1, "complete": False} for i in range(3)]
+    created = [result["id"] for result in client.post("/todos/bulk", json=todos).json()["results"]]
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        page = client.get("/todos/changes", params=params).json()
+        seen.extend(todo["id"] for todo in page["updated"])
+        if not page["has_more"]:
+            break
+        params["since"] = page["next_cursor"]
+
+    assert seen == created
+    client.request("DELETE", "/todos/bulk", json={"ids": created})
+
+def test_read_all_sparse_fields(test_todo):
+    response = client.get("/", params={"fields": "title,id,complete"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": test_todo.id, "title": test_todo.title, "complete": test_todo.complete}]
+    assert response.headers["etag"] != client.get("/").headers["etag"]
+
+def test_read_all_sparse_fields_paginated(test_todo):
+    db = Testing_session_local()
+    db.add(Todos(title="second", description="test", priority=2, complete=False, owner_id=1))
+    db.commit()
+    db.close()
+
+    page = client.get("/", params={"fields": "title", "limit": 1}).json()
+    assert page["items"] == [{"title": test_todo.title}]
+    page = client.get("/", params={"fields": "title", "limit": 1, "after": page["next_cursor"]}).json()
+    assert page == {"items": [{"title": "second"}], "next_cursor": None}
+
+def test_read_one_sparse_fields(test_todo):
+    response = client.get(f"/todo/{test_todo.id}", params={"fields": "id,title"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": test_todo.id, "title": test_todo.title}
+
+def test_read_all_unknown_field():
+    response = client.get("/", params={"fields": "id,secret"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_read_all_filters(test_todo):
+    db = Testing_session_local()
+    db.add_all([
+        Todos(title="shopping", description="test", priority=2, complete=True, owner_id=1),
+        Todos(title="shop_sign", description="test", priority=4, complete=False, owner_id=1),
+        Todos(title="shopping", description="test", priority=2, complete=True, owner_id=2),
+    ])
+    db.commit()
+    db.close()
+
+    def titles(**params):
+        response = client.get("/", params={**params, "fields": "title"})
+        assert response.status_code == status.HTTP_200_OK
+        return [item["title"] for item in response.json()]
+
+    assert titles(complete=True) == ["shopping"]
+    assert titles(priority_min=2, priority_max=3) == ["shopping"]
+    assert titles(title_prefix="shop", sort="title") == ["shop_sign", "shopping"]
+    assert titles(title_prefix="shop_") == ["shop_sign"]
+    assert titles(title_prefix="SHOP") == []
+
+def test_title_prefix_compared_bytewise_on_postgres():
+    from sqlalchemy.dialects import postgresql
+    from routers.todos import _todo_conditions
+
+    range_start, range_end, _ = _todo_conditions("postgresql", None, None, None, "a-")
+    for condition in (range_start, range_end):
+        assert 'COLLATE "C"' in str(condition.compile(dialect=postgresql.dialect()))
+
+def test_read_all_sorted_by_title_paginated(test_todo):
+    db = Testing_session_local()
+    db.add_all([Todos(title=title, description="test", priority=1, complete=False, owner_id=1) for title in ("b", "a", "c")])
+    db.commit()
+    db.close()
+
+    seen = []
+    params = {"sort": "title", "limit": 2}
+    while True:
+        page = client.get("/", params=params).json()
+        seen.extend(item["title"] for item in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert seen == ["a", "b", "c", "test"]
+
+def test_sort_keys_are_not_nullable():
+    for keys, _ in SORT_KEYS.values():
+        assert not any(key.nullable for key in keys)
+
+def test_read_all_cursor_must_match_sort(test_todo):
+    db = Testing_session_local()
+    db.add(Todos(title="second", description="test", priority=2, complete=False, owner_id=1))
+    db.commit()
+    db.close()
+
+    cursor = client.get("/", params={"limit": 1}).json()["next_cursor"]
+    response = client.get("/", params={"sort": "title", "limit": 1, "after": cursor})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_search_ranked_and_paginated(test_todo):
+    db = Testing_session_local()
+    db.add_all([
+        Todos(title="buy milk", description="from the corner shop", priority=1, complete=False, owner_id=1),
+        Todos(title="milk run", description="milk for the milk jug", priority=2, complete=False, owner_id=1),
+        Todos(title="milk", description="someone else's", priority=1, complete=False, owner_id=2),
+    ])
+    db.commit()
+    db.close()
+
+    seen = []
+    params = {"q": "milk", "limit": 1, "fields": "title"}
+    while True:
+        response = client.get("/todos/search", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        seen.extend(item["title"] for item in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert seen == ["milk run", "buy milk"]
+
+def test_search_follows_writes(test_todo):
+    assert client.get("/todos/search", params={"q": "groceries"}).json()["items"] == []
+
+    todo = {"title": "groceries", "description": "weekly shop", "priority": 1, "complete": False}
+    client.put(f"/todo/{test_todo.id}", json=todo)
+    assert [item["id"] for item in client.get("/todos/search", params={"q": "groceries"}).json()["items"]] == [test_todo.id]
+
+    client.delete(f"/todo/{test_todo.id}")
+    assert client.get("/todos/search", params={"q": "groceries"}).json()["items"] == []
+
+def test_search_does_not_match_owner_id(test_todo):
+    assert client.get("/todos/search", params={"q": str(test_todo.owner_id)}).json()["items"] == []
+
+def test_search_requires_terms():
+    response = client.get("/todos/search", params={"q": "!!!"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+def test_suggest_titles(test_todo):
+    db = Testing_session_local()
+    db.add_all([
+        Todos(title=title, description="test", priority=1, complete=False, owner_id=owner_id)
+        for title, owner_id in (("pay rent", 1), ("pack bags", 1), ("pay rent", 1), ("pay tax", 1), ("pay fine", 2))
+    ])
+    db.commit()
+    db.close()
+
+    response = client.get("/todos/suggest", params={"prefix": "pa"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"suggestions": ["pack bags", "pay rent", "pay tax"]}
+    assert client.get("/todos/suggest", params={"prefix": "pa", "limit": 1}).json() == {"suggestions": ["pack bags"]}
+
+def test_suggest_narrows_cached_prefix_and_follows_writes(test_todo):
+    assert client.get("/todos/suggest", params={"prefix": "t"}).json() == {"suggestions": ["test"]}
+
+    # Written behind the router's back, so only a fresh query would see it.
+    db = Testing_session_local()
+    db.add(Todos(title="tea", description="test", priority=1, complete=False, owner_id=1))
+    db.commit()
+    db.close()
+    assert client.get("/todos/suggest", params={"prefix": "te"}).json() == {"suggestions": ["test"]}
+    assert client.get("/todos/suggest", params={"prefix": "tx"}).json() == {"suggestions": []}
+
+    client.post("/todo", json={"title": "text mum", "description": "test", "priority": 1, "complete": False})
+    assert client.get("/todos/suggest", params={"prefix": "t"}).json() == {"suggestions": ["tea", "test", "text mum"]}
+
+@pytest.mark.parametrize("from_counters", [False, True])
+def test_stats(test_todo, monkeypatch, from_counters):
+    monkeypatch.setattr("stats.TODO_STATS_FROM_COUNTERS", from_counters)
+    todo = {"title": "stats", "description": "test", "priority": 3, "complete": False}
+    ids = [item["id"] for item in client.post("/todos/bulk", json=[todo, todo, todo]).json()["results"]]
+    client.put(f"/todo/{ids[0]}", json={**todo, "complete": True})
+    client.delete(f"/todo/{ids[1]}")
+    db = Testing_session_local()
+    db.add(Todos(title="other", description="test", priority=3, complete=False, owner_id=2))
+    db.commit()
+    db.close()
+
+    response = client.get("/todos/stats")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "total": 3,
+        "by_complete": {"true": 1, "false": 2},
+        "by_priority": {"1": 1, "3": 2},
+        "groups": [
+            {"complete": False, "priority": 1, "count": 1},
+            {"complete": False, "priority": 3, "count": 1},
+            {"complete": True, "priority": 3, "count": 1},
+        ],
+    }
@@ -0,0 +1,20 @@
+from .utils import *
+
+
+def test_read_user(test_user):
+    response = client.get("/users/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": 1, "email": "test@example.com", "username": "test", "first_name": "Test",
+                               "last_name": "User", "is_active": test_user.is_active, "role": "user",
+                               "phone_number": "1234567890"}
+
+
+def test_read_user_sparse_fields(test_user):
+    response = client.get("/users/", params={"fields": "username,email"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"email": "test@example.com", "username": "test"}
+
+
+def test_read_user_rejects_password_hash(test_user):
+    response = client.get("/users/", params={"fields": "username,hashed_password"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,74 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, get_db, get_session_factory, get_session_router
+from sqlalchemy.pool import NullPool, StaticPool
+from main import app
+from routers.auth import get_current_user, get_read_db
+from fastapi.testclient import TestClient
+from fastapi import status, HTTPException
+import pytest
+from models import Todos, Users
+from cache import todo_list_cache, todo_suggest_cache
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+Testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+# TestClient runs every request on a fresh event loop, so async connections
+# must not be pooled across requests.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+Testing_async_session_local = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def override_get_db():
+    async with Testing_async_session_local() as db:
+        yield db
+
+def override_get_current_user():
+    return {"user_name": "test", "user_id": 1, "role": "user"}
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: Testing_async_session_local
+app.dependency_overrides[get_current_user] = override_get_current_user
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def clear_todo_list_cache():
+    # Fixtures write straight to the database, bypassing the routers' invalidation.
+    todo_list_cache.clear()
+    todo_suggest_cache.clear()
+
+@pytest.fixture()
+def test_todo():
+    todo = Todos(title="test", description="test", priority=1, complete=False, owner_id=1)
+    
+    db = Testing_session_local()
+    db.add(todo)
+    db.commit()
+    db.refresh(todo)
+    yield todo
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM todos"))
+        connection.commit()
+
+@pytest.fixture()
+def test_user():
+    user = Users(id=1, username="test", email="test@example.com", first_name="Test", last_name="User",
+                 hashed_password="not-a-real-hash", role="user", phone_number="1234567890")
+
+    db = Testing_session_local()
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    yield user
+    with engine.connect() as connection:
+        connection.execute(text("DELETE FROM todo_tombstones"))
+        connection.execute(text("DELETE FROM users"))
+        connection.commit()
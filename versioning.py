@@ -0,0 +1,49 @@
+from sqlalchemy import insert, select, update
+from models import TodoTombstones, Users
+from schemas import TODO_FIELDS
+
+
+async def todo_version(db, owner_id: int) -> int:
+    """Current version of ``owner_id``'s todo list; one primary-key lookup."""
+    return await db.scalar(select(Users.todo_version).where(Users.id == owner_id)) or 0
+
+
+async def bump_todo_version(db, owner_id: int) -> int:
+    """Advance the owner's version in the same transaction as a todo write.
+
+    The returned value is stamped on every row the write touches, which makes
+    it the change cursor for delta sync. On Postgres the UPDATE also locks the
+    user row until commit, so an owner's versions commit in increasing order.
+    """
+    statement = update(Users).where(Users.id == owner_id).values(todo_version=Users.todo_version + 1)
+    options = {"synchronize_session": False}
+
+    if db.get_bind().dialect.update_returning:
+        return await db.scalar(statement.returning(Users.todo_version), execution_options=options) or 0
+
+    await db.execute(statement, execution_options=options)
+    return await todo_version(db, owner_id)
+
+
+async def record_deletions(db, owner_id: int, todo_ids) -> int:
+    """Bump the owner's version and leave a tombstone for each deleted todo."""
+    version = await bump_todo_version(db, owner_id)
+    await db.execute(
+        insert(TodoTombstones),
+        [{"todo_id": todo_id, "owner_id": owner_id, "version": version} for todo_id in todo_ids],
+    )
+    return version
+
+
+def todo_etag(owner_id: int, version: int, columns: tuple = ()) -> str:
+    """Entity tag for the owner's todos; a ``?fields=`` projection gets its own."""
+    if 0 < len(columns) < len(TODO_FIELDS):
+        return f'"{owner_id}-{version}-{".".join(column.key for column in columns)}"'
+    return f'"{owner_id}-{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates